@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionQueue:
+    # FIFO in front of Database.register_batch for registration bursts.
+    # Requests are accepted into a local SQLite file shared by every worker on
+    # the host; a single drainer (whichever worker holds the lock file) moves
+    # them into MySQL in batches at a bounded rate.
+    def __init__(self, path, register_batch, batch_size=50, interval=0.2, stale_after=60, keep_for=3600):
+        self.path = path
+        self.register_batch = register_batch
+        self.batch_size = batch_size
+        self.interval = interval
+        self.stale_after = stale_after
+        self.keep_for = keep_for
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._schema_ready = False
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if not self._schema_ready:
+                connection.execute("""
+                    CREATE TABLE IF NOT EXISTS admissions (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        ticket TEXT UNIQUE NOT NULL,
+                        event_id INTEGER NOT NULL,
+                        payload TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'queued',
+                        message TEXT,
+                        created_at REAL NOT NULL,
+                        claimed_at REAL,
+                        finished_at REAL
+                    )
+                """)
+                connection.execute("CREATE INDEX IF NOT EXISTS idx_admissions_status ON admissions (status, id)")
+                self._schema_ready = True
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def enqueue(self, event_id, registration_data):
+        ticket = secrets.token_urlsafe(12)
+        connection = self._connection()
+        cursor = connection.execute(
+            "INSERT INTO admissions (ticket, event_id, payload, created_at) VALUES (?, ?, ?, ?)",
+            (ticket, event_id, json.dumps(registration_data), time.time())
+        )
+        position = self._position(connection, cursor.lastrowid)
+        self.start()
+        self._wakeup.set()
+        return ticket, position
+
+    def _position(self, connection, row_id):
+        row = connection.execute(
+            "SELECT COUNT(*) FROM admissions WHERE status = 'queued' AND id <= ?", (row_id,)
+        ).fetchone()
+        return row[0]
+
+    def status(self, ticket):
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT id, event_id, status, message FROM admissions WHERE ticket = ?", (ticket,)
+        ).fetchone()
+        if row is None:
+            return None
+        row_id, event_id, status, message = row
+        result = {'ticket': ticket, 'event_id': event_id, 'status': status, 'message': message}
+        if status == 'queued':
+            result['position'] = self._position(connection, row_id)
+        return result
+
+    def stats(self):
+        connection = self._connection()
+        rows = connection.execute("SELECT status, COUNT(*) FROM admissions GROUP BY status").fetchall()
+        return dict(rows)
+
+    def start(self):
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        thread = threading.Thread(target=self._run, name='admission-drainer', daemon=True)
+        thread.start()
+
+    def _run(self):
+        lock_file = open(self.path + '.lock', 'a')
+        while True:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    # Another worker is draining; check back in case it exits
+                    time.sleep(5)
+                    continue
+            try:
+                while True:
+                    drained = self.drain_once()
+                    if drained:
+                        time.sleep(self.interval)
+                    else:
+                        self._wakeup.wait(1)
+                        self._wakeup.clear()
+            except Exception as e:
+                logger.error(f"Error draining admission queue: {e}")
+                time.sleep(1)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def drain_once(self):
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Rows stuck in 'processing' belong to a drainer that died mid-batch
+            rows = connection.execute("""
+                SELECT id, event_id, payload FROM admissions
+                WHERE status = 'queued' OR (status = 'processing' AND claimed_at < ?)
+                ORDER BY id LIMIT ?
+            """, (now - self.stale_after, self.batch_size)).fetchall()
+            connection.executemany(
+                "UPDATE admissions SET status = 'processing', claimed_at = ? WHERE id = ?",
+                [(now, row[0]) for row in rows]
+            )
+            connection.execute("DELETE FROM admissions WHERE finished_at < ?", (now - self.keep_for,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        if not rows:
+            return 0
+
+        results = self.register_batch([(event_id, json.loads(payload)) for _, event_id, payload in rows])
+        finished_at = time.time()
+        connection.execute("BEGIN")
+        connection.executemany(
+            "UPDATE admissions SET status = ?, message = ?, finished_at = ? WHERE id = ?",
+            [
+                ('registered' if success else 'rejected', message, finished_at, row[0])
+                for row, (success, message) in zip(rows, results)
+            ]
+        )
+        connection.execute("COMMIT")
+        return len(rows)
@@ -1,14 +1,102 @@
-from flask import Flask, render_template, request, flash, redirect, url_for, session, jsonify
+from flask import Flask, Response, render_template, request, flash, redirect, url_for, session, jsonify, stream_with_context
 from config import Config
 from database import db
+from admission import AdmissionQueue
+from importer import Importer, SPECS as IMPORT_KINDS, open_records
+from passwords import HashingOverloaded
+from concurrent_db import ConcurrentDatabase, QueryTimeout
+from profiler import SamplingProfiler
+from certificates import CertificateJobs
+from certificate_codes import CertificateVerifier, RevocationList
+from search import SearchService
+from conditional import ConditionalGet
+from page_cache import PageCache
+import tasks
+import metrics
+import hmac
+import export
+import datetime
+import io
 import os
+import time
 
 app = Flask(__name__)
 app.config.from_object(Config)
+db.init_app(app)
+metrics.init_app(app, threshold_ms=app.config['SLOW_QUERY_THRESHOLD_MS'])
+metrics.registry.add_gauges('db_pool', 'Connection pool state', db.pool_stats)
+metrics.registry.add_gauges('db_replicas', 'Read replica state', db.replica_stats)
+metrics.registry.add_gauges('db_cache', 'Query cache state', db.cache_stats)
+metrics.registry.add_gauges('certificate_cache', 'Certificate lookup cache state', db.certificates.stats)
+
+profiler = SamplingProfiler(
+    interval=app.config['PROFILER_INTERVAL_MS'] / 1000,
+    sample_rate=app.config['PROFILER_SAMPLE_RATE']
+)
+profiler.init_app(app)
+
+conditional = ConditionalGet(
+    db.cache.versions,
+    max_age=app.config['HTTP_CACHE_MAX_AGE'],
+    release=app.config['RELEASE'],
+    fill_allowed=db.cache_fills_allowed
+)
+
+page_cache = PageCache(
+    db.cache.versions,
+    max_bytes=app.config['PAGE_CACHE_MAX_BYTES'],
+    compress=app.config['PAGE_CACHE_COMPRESS'],
+    enabled=app.config['PAGE_CACHE_ENABLED'],
+    fill_allowed=db.cache_fills_allowed
+)
+metrics.registry.add_gauges('page_cache', 'Rendered page cache state', page_cache.stats)
+
+certificate_jobs = CertificateJobs(
+    db,
+    app.config['CERTIFICATE_OUTPUT_DIR'],
+    processes=app.config['CERTIFICATE_RENDER_PROCESSES'],
+    batch_size=app.config['CERTIFICATE_BATCH_SIZE'],
+    enqueue=lambda payload: tasks.enqueue(tasks.CERTIFICATES, payload)
+)
+
+certificate_verifier = CertificateVerifier(
+    db.signer,
+    RevocationList(db.get_revoked_certification_ids, db.cache.versions, ttl=app.config['CACHE_TTL']),
+    db.get_certifications_by_codes
+)
+
+search_service = SearchService(db, db.cache.versions)
+
+fanout = ConcurrentDatabase(db, max_workers=app.config['DB_FANOUT_WORKERS'], timeout=app.config['DB_FANOUT_TIMEOUT'])
+
+def register_and_confirm(registrations):
+    results = db.register_batch(registrations)
+    tasks.enqueue_many(tasks.REGISTRATION_CONFIRMATION, [
+        dict(data, event_id=event_id)
+        for (event_id, data), (success, _) in zip(registrations, results) if success
+    ])
+    return results
+
+admission = AdmissionQueue(
+    app.config['REGISTRATION_QUEUE_PATH'],
+    register_and_confirm,
+    batch_size=app.config['REGISTRATION_QUEUE_BATCH_SIZE'],
+    interval=app.config['REGISTRATION_QUEUE_INTERVAL']
+)
 
 # Use environment variable for secret key in production
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-12345')
 
+@app.errorhandler(HashingOverloaded)
+def hashing_overloaded(e):
+    response = app.response_class('Too many sign-ins right now, please try again in a moment.', status=503)
+    response.headers['Retry-After'] = '2'
+    return response
+
+@app.errorhandler(QueryTimeout)
+def query_timeout(e):
+    return app.response_class('The page took too long to load, please try again.', status=504)
+
 def login_required(f):
     from functools import wraps
     @wraps(f)
@@ -18,31 +106,73 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def event_cursor(event):
+    return f"{event['date']}_{event['time']}_{event['id']}"
+
+def parse_event_cursor(value):
+    # Comes from the URL; anything but a real (date, time, id) is the first page
+    try:
+        event_date, event_time, event_id = value.split('_')
+        hours, minutes, seconds = (int(part) for part in event_time.split(':'))
+        return (datetime.date.fromisoformat(event_date),
+                datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds),
+                int(event_id))
+    except (AttributeError, ValueError):
+        return None
+
 @app.route('/')
+@conditional('events')
+@page_cache('events')
 def index():
-    events = db.get_all_events(active_only=True)[:3]
+    events = db.get_events(limit=3)
     return render_template('index.html', events=events)
 
 @app.route('/events')
+@conditional('events')
+@page_cache('events', query_args=('category', 'after'))
 def events():
     category = request.args.get('category', 'all')
-    all_events = db.get_all_events(active_only=True)
+    after = parse_event_cursor(request.args.get('after'))
+    page_size = app.config['EVENTS_PAGE_SIZE']
     
-    if category == 'all':
-        filtered_events = all_events
-    else:
-        filtered_events = [event for event in all_events if event['category'] == category]
+    # One extra row tells us whether there is a next page
+    page = db.get_events(category=None if category == 'all' else category, limit=page_size + 1, after=after)
+    next_cursor = event_cursor(page[page_size - 1]) if len(page) > page_size else None
     
-    categories = list(set(event['category'] for event in all_events))
-    return render_template('events.html', events=filtered_events, categories=categories, current_category=category)
+    categories = db.get_event_categories()
+    return render_template('events.html', events=page[:page_size], categories=categories,
+                           current_category=category, next_cursor=next_cursor, is_first_page=after is None)
 
 @app.route('/projects')
+@conditional('projects')
+@page_cache('projects', query_args=('category', 'tech'))
 def projects():
     category = request.args.get('category', 'all')
-    projects = db.get_all_projects(category)
+    tech = request.args.get('tech') or None
+    projects = db.get_all_projects(category, tech)
     categories = db.get_project_categories()
+    facets = db.get_project_facets()
+    technologies = facets['technologies'] if category == 'all' else facets['by_category'].get(category, [])
+    
+    return render_template('projects.html', projects=projects, categories=categories, current_category=category,
+                           technologies=technologies, current_tech=tech)
+
+@app.route('/search')
+def search():
+    query = request.args.get('q', '').strip()
+    kind = request.args.get('type') or None
+    category = request.args.get('category') or None
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    
+    started = time.perf_counter()
+    results = search_service.search(query, kind=kind, category=category, limit=limit) if query else []
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
     
-    return render_template('projects.html', projects=projects, categories=categories, current_category=category)
+    if request.args.get('format') == 'json':
+        return jsonify(query=query, results=results, elapsed_ms=elapsed_ms)
+    return render_template('search.html', query=query, results=results, kind=kind,
+                           categories=search_service.categories(kind), current_category=category,
+                           elapsed_ms=elapsed_ms)
 
 @app.route('/quiz')
 def quiz():
@@ -63,6 +193,8 @@ def contact():
         }
         
         if db.add_club_member(member_data):
+            # Same transaction as the insert; the worker sends it
+            tasks.enqueue(tasks.EMAIL, tasks.welcome_email(member_data))
             flash(f'Thank you {member_data["name"]}! Your membership application has been received.', 'success')
         else:
             flash('There was an error processing your application. Please try again.', 'error')
@@ -108,6 +240,7 @@ def generate_certificate():
         return redirect(url_for('certification'))
 
 @app.route('/certificate/<code>')
+@conditional('certifications')
 def view_certificate(code):
     certification = db.get_certification_by_code(code)
     if not certification:
@@ -118,15 +251,39 @@ def view_certificate(code):
 
 @app.route('/verify_certificate', methods=['POST'])
 def verify_certificate():
-    code = request.form.get('certificate_code')
-    certification = db.get_certification_by_code(code)
+    result = certificate_verifier.verify([request.form.get('certificate_code')])[0]
     
-    if certification:
-        return render_template('verify_certificate.html', cert=certification, verified=True)
+    if result['valid']:
+        return render_template('verify_certificate.html', cert=result['certificate'], verified=True)
+    elif result['revoked']:
+        return render_template('verify_certificate.html', cert=result['certificate'], verified=False, revoked=True)
     else:
         flash('Invalid certificate code', 'error')
         return render_template('verify_certificate.html', verified=False)
 
+@app.route('/api/certificates/verify', methods=['POST'])
+def api_verify_certificates():
+    codes = (request.get_json(silent=True) or {}).get('codes')
+    if not isinstance(codes, list) or not codes:
+        return jsonify(error='Expected a JSON body like {"codes": ["..."]}'), 400
+    if len(codes) > app.config['CERTIFICATE_VERIFY_MAX_CODES']:
+        return jsonify(error=f"At most {app.config['CERTIFICATE_VERIFY_MAX_CODES']} codes per request"), 413
+    
+    results = []
+    for result in certificate_verifier.verify(codes):
+        cert = result['certificate']
+        results.append({
+            'code': result['code'],
+            'valid': result['valid'],
+            'revoked': result['revoked'],
+            'certificate': {
+                'user_name': cert['user_name'],
+                'certificate_type': cert['certificate_type'],
+                'issue_date': cert['issue_date'].isoformat(),
+            } if cert else None
+        })
+    return jsonify(results=results)
+
 @app.route('/register_event/<int:event_id>', methods=['POST'])
 def register_event(event_id):
     registration_data = {
@@ -136,15 +293,32 @@ def register_event(event_id):
         'year': request.form.get('year')
     }
     
+    if app.config['REGISTRATION_QUEUE_ENABLED']:
+        ticket, position = admission.enqueue(event_id, registration_data)
+        status_url = url_for('registration_status', ticket=ticket)
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify(ticket=ticket, position=position, status_url=status_url), 202
+        flash(f'You are number {position} in line. We will confirm your spot shortly.', 'success')
+        return redirect(url_for('events', ticket=ticket))
+    
     success, message = db.register_for_event(event_id, registration_data)
     
     if success:
+        # The registration is already committed; the job commits with the request
+        tasks.enqueue(tasks.REGISTRATION_CONFIRMATION, dict(registration_data, event_id=event_id))
         flash(f'Successfully registered for the event!', 'success')
     else:
         flash(message, 'error')
     
     return redirect(url_for('events'))
 
+@app.route('/register_event/status/<ticket>')
+def registration_status(ticket):
+    status = admission.status(ticket)
+    if status is None:
+        return jsonify(error='Unknown ticket'), 404
+    return jsonify(status)
+
 @app.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     if request.method == 'POST':
@@ -176,13 +350,20 @@ def admin_logout():
 @app.route('/admin')
 @login_required
 def admin_dashboard():
-    events = db.get_all_events(active_only=False)
-    registrations = db.get_event_registrations()
+    # The aggregates are slow enough to be worth their own connections; the
+    # numbers may come from slightly different moments (see ConcurrentDatabase)
+    events, totals, event_fill, categories = fanout.gather(
+        (db.get_all_events, False),
+        (db.get_dashboard_totals,),
+        (db.get_event_fill_ratios,),
+        (db.get_registrations_by_category,)
+    )
+    stats = dict(totals, event_fill=event_fill, categories=categories)
     
     return render_template('admin.html', 
                          events=events, 
                          categories=app.config['EVENT_CATEGORIES'],
-                         total_registrations=len(registrations))
+                         stats=stats)
 
 @app.route('/admin/events/add', methods=['POST'])
 @login_required
@@ -204,6 +385,25 @@ def add_event():
     
     return redirect(url_for('admin_dashboard'))
 
+@app.route('/admin/projects/add', methods=['POST'])
+@login_required
+def add_project():
+    project_data = {
+        'title': request.form.get('title'),
+        'description': request.form.get('description'),
+        'category': request.form.get('category'),
+        'github_url': request.form.get('github_url') or None,
+        'technologies': request.form.get('technologies', '').split(','),
+        'created_by': session.get('admin_id')
+    }
+    
+    if db.add_project(project_data):
+        flash('Project added successfully!', 'success')
+    else:
+        flash('Error adding project!', 'error')
+    
+    return redirect(url_for('admin_dashboard'))
+
 @app.route('/admin/events/<int:event_id>/toggle', methods=['POST'])
 @login_required
 def toggle_event(event_id):
@@ -228,6 +428,37 @@ def delete_event(event_id):
     
     return redirect(url_for('admin_dashboard'))
 
+@app.route('/admin/certifications/<int:cert_id>/revoke', methods=['POST'])
+@login_required
+def revoke_certification(cert_id):
+    if db.revoke_certification(cert_id):
+        flash('Certificate revoked', 'success')
+    else:
+        flash('Certificate not found or already revoked', 'error')
+    return redirect(url_for('admin_certifications'))
+
+@app.route('/admin/events/<int:event_id>/certificates', methods=['POST'])
+@login_required
+def issue_event_certificates(event_id):
+    event = db.get_event_by_id(event_id)
+    if not event:
+        return jsonify(error='Event not found'), 404
+    job_id = certificate_jobs.start(
+        event_id,
+        request.form.get('certificate_type') or f"{event['category']} Participation",
+        issue_date=request.form.get('issue_date') or None,
+        generated_by=session.get('admin_id')
+    )
+    return jsonify(job=job_id, status_url=url_for('certificate_job_status', job_id=job_id)), 202
+
+@app.route('/admin/certificates/jobs/<job_id>')
+@login_required
+def certificate_job_status(job_id):
+    job = certificate_jobs.status(job_id)
+    if job is None:
+        return jsonify(error='Unknown job'), 404
+    return jsonify(job)
+
 @app.route('/admin/registrations')
 @login_required
 def view_registrations():
@@ -244,6 +475,123 @@ def view_registrations():
                          events=events,
                          current_event=current_event)
 
+def export_response(batches, columns, name):
+    fmt = request.args.get('format', 'csv')
+    if fmt not in export.FORMATS:
+        return jsonify(error=f'Unsupported format: {fmt}'), 400
+    
+    return Response(
+        stream_with_context(export.stream_rows(batches, columns, fmt)),
+        mimetype=export.FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={name}.{fmt}'}
+    )
+
+@app.route('/admin/registrations/export')
+@login_required
+def export_registrations():
+    batches = db.iter_registrations(
+        event_id=request.args.get('event_id') or None,
+        since=request.args.get('since') or None,
+        until=request.args.get('until') or None
+    )
+    return export_response(batches, export.REGISTRATION_COLUMNS, 'registrations')
+
+@app.route('/admin/members/export')
+@login_required
+def export_members():
+    batches = db.iter_club_members(
+        since=request.args.get('since') or None,
+        until=request.args.get('until') or None
+    )
+    return export_response(batches, export.MEMBER_COLUMNS, 'members')
+
+@app.route('/admin/import', methods=['POST'])
+@login_required
+def bulk_import():
+    upload = request.files.get('file')
+    kind = request.form.get('kind')
+    if not upload or not upload.filename or kind not in IMPORT_KINDS:
+        flash('Choose a file and what it contains.', 'error')
+        return redirect(url_for('admin_dashboard'))
+    
+    fmt = upload.filename.rsplit('.', 1)[-1].lower()
+    importer = Importer(db, kind, on_duplicate=request.form.get('on_duplicate', 'skip'))
+    try:
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        report = importer.run(open_records(stream, fmt))
+    except (ValueError, RuntimeError) as e:
+        flash(f'Import failed: {e}', 'error')
+        return redirect(url_for('admin_dashboard'))
+    
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(report)
+    
+    flash(f"Imported {report['loaded']} of {report['rows']} {kind} rows "
+          f"({report['duplicates']} duplicates, {report['error_count']} errors, {report['rows_per_sec']} rows/sec).",
+          'error' if report['error_count'] else 'success')
+    for error in report['errors'][:10]:
+        flash(f"Row {error['row']}: {error['error']}", 'error')
+    return redirect(url_for('admin_dashboard'))
+
+@app.route('/admin/metrics')
+def admin_metrics():
+    token = app.config['METRICS_TOKEN']
+    bearer = request.headers.get('Authorization', '')
+    if not session.get('admin_logged_in') and not (token and hmac.compare_digest(bearer, f'Bearer {token}')):
+        return redirect(url_for('admin_login'))
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/admin/profiler')
+@login_required
+def admin_profiler():
+    route = request.args.get('route') or None
+    fmt = request.args.get('format', 'json')
+    if fmt == 'collapsed':
+        return Response(profiler.collapsed(route), mimetype='text/plain')
+    return jsonify(
+        routes=profiler.routes(),
+        top=profiler.top(route, n=request.args.get('n', 20, type=int))
+    )
+
+@app.route('/admin/profiler/reset', methods=['POST'])
+@login_required
+def reset_profiler():
+    profiler.reset()
+    return jsonify(ok=True)
+
+@app.route('/admin/pool')
+@login_required
+def admin_pool_stats():
+    return jsonify(db.pool_stats())
+
+@app.route('/admin/replicas')
+@login_required
+def admin_replica_status():
+    if db.replicas is None:
+        return jsonify(replicas=[])
+    return jsonify(replicas=db.replicas.status(), stats=db.replicas.stats())
+
+@app.route('/admin/cache')
+@login_required
+def admin_cache_stats():
+    return jsonify(queries=db.cache_stats(), pages=page_cache.stats())
+
+@app.route('/admin/jobs')
+@login_required
+def admin_job_stats():
+    return jsonify(tasks.queue.stats())
+
+@app.route('/admin/newsletters/<int:campaign_id>/send', methods=['POST'])
+@login_required
+def send_newsletter(campaign_id):
+    campaign = db.get_campaign(campaign_id)
+    if campaign is None:
+        return jsonify(error='Campaign not found'), 404
+    job_id = tasks.enqueue(tasks.NEWSLETTER, {'campaign_id': campaign_id})
+    if job_id is None:
+        return jsonify(error='Could not queue the newsletter'), 503
+    return jsonify(job=job_id, campaign=campaign_id), 202
+
 @app.route('/admin/certifications')
 @login_required
 def admin_certifications():
@@ -0,0 +1,163 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# version, unix time of the last bump
+_COUNTER = struct.Struct('QQ')
+
+
+def content_namespace(namespace):
+    # Second counter per namespace, bumped only when row content changed
+    # rather than just counters such as seats taken
+    return f'{namespace}-content'
+
+
+class VersionStore:
+    # One counter per namespace in a small mmap'ed file, next to the time it
+    # was last bumped. The mapping is shared, so every gunicorn worker on the
+    # host sees a bump immediately and reading a version is a memory access
+    # rather than a syscall or query.
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._maps = {}
+
+    def _open(self, namespace):
+        entry = self._maps.get(namespace)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._maps.get(namespace)
+            if entry is None:
+                os.makedirs(self.directory, exist_ok=True)
+                path = os.path.join(self.directory, f'{namespace}.version')
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+                if os.fstat(fd).st_size < _COUNTER.size:
+                    os.ftruncate(fd, _COUNTER.size)
+                entry = (fd, mmap.mmap(fd, _COUNTER.size))
+                self._stamp_new(entry)
+                self._maps[namespace] = entry
+        return entry
+
+    def _stamp_new(self, entry):
+        # Files created before timestamps were tracked, or just now, count as
+        # modified when first opened.
+        fd, counter = entry
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            version, modified = _COUNTER.unpack_from(counter)
+            if not modified:
+                _COUNTER.pack_into(counter, 0, version, int(time.time()))
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def get(self, namespace):
+        return _COUNTER.unpack_from(self._open(namespace)[1])[0]
+
+    def modified(self, namespace):
+        return _COUNTER.unpack_from(self._open(namespace)[1])[1]
+
+    def bump(self, namespace):
+        fd, counter = self._open(namespace)
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                version = _COUNTER.unpack_from(counter)[0] + 1
+                _COUNTER.pack_into(counter, 0, version, int(time.time()))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+        return version
+
+
+class QueryCache:
+    # Read-through cache for Database readers. Entries are keyed by
+    # (namespace, key) and remember the namespace version they were loaded
+    # under, so a bump from any worker makes them stale without a broadcast.
+    # fill_allowed() returning False keeps a result out of the cache.
+    # snapshot_version(namespace) gives the version as of the start of the
+    # caller's snapshot transaction, or None; a result read from a snapshot
+    # older than the version it would be stored under is not cached.
+    def __init__(self, versions, max_entries=256, ttl=60, enabled=True, fill_allowed=None, snapshot_version=None):
+        self.versions = versions
+        self.fill_allowed = fill_allowed
+        self.snapshot_version = snapshot_version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'expired': 0,
+            'evictions': 0,
+            'invalidations': 0,
+        }
+
+    def lookup(self, namespace, key):
+        if not self.enabled:
+            return False, None, None
+        version = self.versions.get(namespace)
+        full_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None, version
+            value, entry_version, expires_at = entry
+            if entry_version != version:
+                self._stats['stale'] += 1
+            elif expires_at < time.monotonic():
+                self._stats['expired'] += 1
+            else:
+                self._entries.move_to_end(full_key)
+                self._stats['hits'] += 1
+                return True, value, version
+            del self._entries[full_key]
+            self._stats['misses'] += 1
+        return False, None, version
+
+    def store(self, namespace, key, value, version):
+        if not self.enabled or (self.fill_allowed is not None and not self.fill_allowed()):
+            return
+        if self.snapshot_version is not None:
+            pinned = self.snapshot_version(namespace)
+            if pinned is not None and pinned < version:
+                return
+        full_key = (namespace, key)
+        with self._lock:
+            self._entries[full_key] = (value, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, *namespaces, content=True):
+        for namespace in namespaces:
+            self.versions.bump(namespace)
+            if content:
+                self.versions.bump(content_namespace(namespace))
+        with self._lock:
+            self._stats['invalidations'] += len(namespaces)
+            for full_key in [k for k in self._entries if k[0] in namespaces]:
+                del self._entries[full_key]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+        return stats
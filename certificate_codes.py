@@ -0,0 +1,178 @@
+import base64
+import binascii
+import bisect
+import datetime
+import hashlib
+import hmac
+import re
+import struct
+import threading
+import time
+from array import array
+
+SIGNED_PREFIX = 'GMU1.'
+LEGACY_PATTERN = re.compile(r'^GMU-[A-HJ-NP-Z2-9]{4}-[A-HJ-NP-Z2-9]{4}$')
+# Rendered certificates are saved as <code>.html, which must fit NAME_MAX (255)
+MAX_CODE_LENGTH = 250
+# Anything shaped like a signed code fits the column; codes whose MAC does
+# not check out (e.g. signed before a SECRET_KEY rotation) are looked up
+SIGNED_PATTERN = re.compile(r'^GMU1\.[A-Za-z0-9_-]{1,250}$')
+MAC_SIZE = 12
+EPOCH = datetime.date(1970, 1, 1)
+# certificate id, days since EPOCH
+_HEADER = struct.Struct('>IH')
+MAX_ID = 2 ** 32 - 1
+MAX_DAYS = 2 ** 16 - 1
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class CertificateSigner:
+    # Codes carry the certificate id, issue date, type and recipient name,
+    # followed by a truncated HMAC-SHA256 under a key derived from the app
+    # secret. Anyone holding the secret can check a code without a query;
+    # only revocation still needs the database.
+    def __init__(self, secret):
+        self._key = hmac.new(secret.encode(), b'certificate-codes', hashlib.sha256).digest()
+
+    def _mac(self, payload):
+        return hmac.new(self._key, payload, hashlib.sha256).digest()[:MAC_SIZE]
+
+    def sign(self, cert_id, user_name, certificate_type, issue_date):
+        # Returns None when the certificate does not fit in a code (id, date
+        # outside 1970-2149 or too long a name); callers keep the random
+        # legacy code, which is verified against the table.
+        days = (issue_date - EPOCH).days
+        if not (0 <= cert_id <= MAX_ID and 0 <= days <= MAX_DAYS):
+            return None
+        payload = _HEADER.pack(cert_id, days)
+        payload += '\x1f'.join([certificate_type, user_name]).encode()
+        code = SIGNED_PREFIX + _b64(payload + self._mac(payload))
+        return code if len(code) <= MAX_CODE_LENGTH else None
+
+    def unsign(self, code):
+        if not code.startswith(SIGNED_PREFIX) or len(code) > MAX_CODE_LENGTH:
+            return None
+        try:
+            blob = _unb64(code[len(SIGNED_PREFIX):])
+        except (binascii.Error, ValueError):
+            return None
+        payload, mac = blob[:-MAC_SIZE], blob[-MAC_SIZE:]
+        if len(payload) < _HEADER.size or not hmac.compare_digest(mac, self._mac(payload)):
+            return None
+        cert_id, days = _HEADER.unpack_from(payload)
+        certificate_type, _, user_name = payload[_HEADER.size:].decode().partition('\x1f')
+        return {
+            'id': cert_id,
+            'certificate_code': code,
+            'certificate_type': certificate_type,
+            'user_name': user_name,
+            'issue_date': EPOCH + datetime.timedelta(days=days),
+        }
+
+
+def check_codes(secret='check'):
+    # Round-trips codes at the edges of the id and date ranges; run with
+    # python certificate_codes.py
+    signer = CertificateSigner(secret)
+    for cert_id, issue_date in [
+        (1, EPOCH),
+        (MAX_ID, EPOCH + datetime.timedelta(days=MAX_DAYS)),
+        (42, datetime.date(2024, 2, 29)),
+    ]:
+        cert = signer.unsign(signer.sign(cert_id, 'Ada Lovelace', 'Participation', issue_date))
+        assert (cert['id'], cert['issue_date']) == (cert_id, issue_date)
+    for cert_id, issue_date in [
+        (1, EPOCH - datetime.timedelta(days=1)),
+        (1, EPOCH + datetime.timedelta(days=MAX_DAYS + 1)),
+        (1, datetime.date(1, 1, 1)),
+        (1, datetime.date(9999, 12, 31)),
+        (MAX_ID + 1, EPOCH),
+    ]:
+        assert signer.sign(cert_id, 'Ada Lovelace', 'Participation', issue_date) is None
+    assert signer.sign(1, 'x' * MAX_CODE_LENGTH, 'Participation', EPOCH) is None
+    assert CertificateSigner('other').unsign(signer.sign(1, 'Ada', 'Participation', EPOCH)) is None
+
+
+class RevocationList:
+    # Sorted array of revoked certificate ids, reloaded when the
+    # 'certifications' version moves (revocations bump it) and at least
+    # every `ttl` seconds, since hosts with their own version files never
+    # see each other's bumps. Checking a signed code is then a binary
+    # search rather than a query. Until a list has loaded, revoked()
+    # returns None and the caller checks the table instead.
+    def __init__(self, load, versions, namespace='certifications', ttl=60):
+        self.load = load
+        self.versions = versions
+        self.namespace = namespace
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._ids = None
+        self._version = None
+        self._expires_at = 0
+
+    def _current(self):
+        version = self.versions.get(self.namespace)
+        if version != self._version or self._expires_at < time.monotonic():
+            with self._lock:
+                if version != self._version or self._expires_at < time.monotonic():
+                    ids = self.load()
+                    if ids is not None:
+                        self._ids = array('I', sorted(ids))
+                        self._version = version
+                        self._expires_at = time.monotonic() + self.ttl
+        return self._ids
+
+    def revoked(self, cert_id):
+        ids = self._current()
+        if ids is None:
+            return None
+        index = bisect.bisect_left(ids, cert_id)
+        return index < len(ids) and ids[index] == cert_id
+
+
+class CertificateVerifier:
+    def __init__(self, signer, revocations, lookup_many):
+        self.signer = signer
+        self.revocations = revocations
+        self.lookup_many = lookup_many
+
+    def verify(self, codes):
+        # One result per input code, in order. Signed codes are checked in
+        # memory; legacy codes, signed codes whose MAC does not match and
+        # signed codes checked before any revocation list has loaded are
+        # looked up together in a single query.
+        results = []
+        legacy = {}
+        for raw in codes:
+            code = (raw or '').strip() if isinstance(raw, str) else ''
+            result = {'code': code, 'valid': False, 'revoked': False, 'certificate': None}
+            results.append(result)
+            cert = self.signer.unsign(code)
+            revoked = None if cert is None else self.revocations.revoked(cert['id'])
+            if revoked is not None:
+                result['revoked'] = revoked
+                result['valid'] = not revoked
+                result['certificate'] = cert
+            elif SIGNED_PATTERN.match(code):
+                legacy.setdefault(code, []).append(result)
+            elif LEGACY_PATTERN.match(code.upper()):
+                legacy.setdefault(code.upper(), []).append(result)
+        if legacy:
+            for cert in self.lookup_many(list(legacy)):
+                for result in legacy.get(cert['certificate_code'], []):
+                    result['revoked'] = cert.get('revoked_at') is not None
+                    result['valid'] = not result['revoked']
+                    result['certificate'] = cert
+        return results
+
+
+if __name__ == '__main__':
+    check_codes()
+    print("Certificate code checks passed")
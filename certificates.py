@@ -0,0 +1,162 @@
+import html
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>Certificate {code}</title>
+    <style>
+        body {{ font-family: Georgia, serif; text-align: center; padding: 60px; }}
+        .frame {{ border: 8px double #006633; padding: 48px; }}
+        h1 {{ color: #006633; }}
+        .name {{ font-size: 2.2em; margin: 24px 0; }}
+        .code {{ font-family: monospace; color: #555; }}
+    </style>
+</head>
+<body>
+    <div class="frame">
+        <h1>GMU Coding Club</h1>
+        <p>This certifies that</p>
+        <div class="name">{name}</div>
+        <p>has earned the <strong>{type}</strong> certificate for <strong>{event}</strong>.</p>
+        <p>Issued {issued}</p>
+        <p class="code">Verification code: {code}</p>
+    </div>
+</body>
+</html>
+"""
+
+
+def render_certificate(cert, path):
+    # Runs in a worker process, so it only touches its arguments and the disk
+    document = TEMPLATE.format(
+        code=html.escape(cert['certificate_code']),
+        name=html.escape(cert['user_name']),
+        type=html.escape(cert['certificate_type']),
+        event=html.escape(cert.get('event_title') or ''),
+        issued=cert['issue_date']
+    )
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(document)
+    os.replace(tmp, path)
+    return path
+
+
+class CertificateJobs:
+    # Issues certificates for every registrant of an event in the background.
+    # Rows are inserted in batches by Database.issue_event_certificates, then
+    # the documents are rendered on a process pool into
+    # <output_dir>/event_<id>/<code>.html. Progress lives in a JSON file per
+    # job so any worker can answer the progress endpoint. With `enqueue`
+    # set, start() hands the job to the background worker instead of
+    # running it on a thread of the web process.
+    def __init__(self, database, output_dir, processes=None, batch_size=500, enqueue=None):
+        self.database = database
+        self.output_dir = output_dir
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.enqueue = enqueue
+
+    def _status_path(self, job_id):
+        return os.path.join(self.output_dir, 'jobs', f'{job_id}.json')
+
+    def _save(self, job):
+        path = self._status_path(job['id'])
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(job, f, default=str)
+        os.replace(tmp, path)
+
+    def status(self, job_id):
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._status_path(job_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def start(self, event_id, certificate_type, issue_date=None, generated_by=None):
+        os.makedirs(os.path.join(self.output_dir, 'jobs'), exist_ok=True)
+        job = {
+            'id': secrets.token_hex(8),
+            'event_id': event_id,
+            'certificate_type': certificate_type,
+            'status': 'queued',
+            'total': None,
+            'issued': 0,
+            'rendered': 0,
+            'error': None,
+            'created_at': time.time(),
+        }
+        self._save(job)
+        if self.enqueue is not None:
+            if self.enqueue({'job_id': job['id'], 'issue_date': issue_date, 'generated_by': generated_by}) is None:
+                job['status'] = 'failed'
+                job['error'] = 'Could not queue the job'
+                self._save(job)
+            return job['id']
+        thread = threading.Thread(target=self.run, args=(job, issue_date, generated_by),
+                                  name=f"certificates-{job['id']}", daemon=True)
+        thread.start()
+        return job['id']
+
+    def run(self, job, issue_date=None, generated_by=None):
+        started = time.perf_counter()
+        try:
+            job['status'] = 'issuing'
+            self._save(job)
+
+            def issued(count):
+                job['issued'] += count
+                self._save(job)
+
+            certificates = self.database.issue_event_certificates(
+                job['event_id'], job['certificate_type'], issue_date=issue_date,
+                generated_by=generated_by, batch_size=self.batch_size, progress=issued
+            )
+            issue_seconds = time.perf_counter() - started
+            job['issue_seconds'] = round(issue_seconds, 3)
+            job['issued_per_sec'] = round(job['issued'] / issue_seconds, 1) if issue_seconds else None
+            job['total'] = len(certificates)
+            job['status'] = 'rendering'
+            self._save(job)
+
+            render_started = time.perf_counter()
+            directory = os.path.join(self.output_dir, f"event_{job['event_id']}")
+            os.makedirs(directory, exist_ok=True)
+            paths = [os.path.join(directory, f"{cert['certificate_code']}.html") for cert in certificates]
+            # spawn, not fork: this runs on a thread inside a threaded worker
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(self.processes, mp_context=context) as pool:
+                chunksize = max(1, len(certificates) // (self.processes * 4))
+                for _ in pool.map(render_certificate, certificates, paths, chunksize=chunksize):
+                    job['rendered'] += 1
+                    if job['rendered'] % 100 == 0:
+                        self._save(job)
+            render_seconds = time.perf_counter() - render_started
+
+            job['render_seconds'] = round(render_seconds, 3)
+            job['rendered_per_sec'] = round(job['rendered'] / render_seconds, 1) if render_seconds else None
+            job['output_dir'] = directory
+            job['status'] = 'done'
+        except Exception as e:
+            logger.error(f"Certificate job {job['id']} failed: {e}")
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            job['seconds'] = round(time.perf_counter() - started, 3)
+            job['finished_at'] = time.time()
+            self._save(job)
+        return job
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import metrics
+from replicas import routed_reads
+
+
+class QueryTimeout(Exception):
+    pass
+
+
+class ConcurrentDatabase:
+    # Runs independent Database reads side by side so a page waits for its
+    # slowest query instead of the sum of them. Calls run on pool threads
+    # with their own pooled connections, outside the request transaction:
+    # they do not see the request's writes, each reads its own moment in
+    # time rather than the request's snapshot, and a page holds one pool
+    # connection per call. Only use it where the reads are slow enough to
+    # pay for that, such as the admin dashboard aggregates; pages served
+    # from the request connection stay consistent.
+    def __init__(self, database, max_workers=8, timeout=5):
+        self.database = database
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='db-fanout')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        # Carry only the request's query counter and replica routing over;
+        # copying the whole context would make the request-scoped connection
+        # visible here.
+        return self._pool().submit(self._call, metrics.request_queries.get(), self.database.read_routing(),
+                                   fn, args, kwargs)
+
+    @staticmethod
+    def _call(counter, routing, fn, args, kwargs):
+        metrics.request_queries.set(counter)
+        routed_reads.set(routing)
+        return fn(*args, **kwargs)
+
+    def gather(self, *calls, timeout=None):
+        # calls are (callable, *args) tuples; results come back in order. If
+        # any call misses the deadline the ones not yet started are cancelled.
+        timeout = self.timeout if timeout is None else timeout
+        futures = [self.submit(fn, *args) for fn, *args in calls]
+        deadline = time.monotonic() + timeout
+        try:
+            return [future.result(max(0, deadline - time.monotonic())) for future in futures]
+        except FutureTimeout:
+            for future in futures:
+                future.cancel()
+            raise QueryTimeout(f"Database calls did not finish within {timeout}s")
@@ -0,0 +1,73 @@
+import functools
+import hashlib
+import time
+from flask import make_response, request, session
+from werkzeug.http import http_date
+
+
+def is_personal():
+    # Signed-in pages and pages about to show flash messages differ per
+    # visitor and must never be shared between them.
+    return bool(session.get('admin_logged_in') or session.get('user_id') or session.get('_flashes'))
+
+
+class ConditionalGet:
+    # Validators for public pages derived from the data versions the page is
+    # built from, so a revalidation is answered with 304 before the view runs
+    # (no MySQL, no template). Pages for signed-in users or with pending
+    # flash messages are personal and are always rendered. When
+    # fill_allowed() is False the page may be older than its versions, so it
+    # goes out without validators.
+    def __init__(self, versions, max_age=0, release='', fill_allowed=None):
+        self.versions = versions
+        self.fill_allowed = fill_allowed
+        self.max_age = max_age
+        self.release = release
+
+    def validators(self, namespaces):
+        versions = [f'{ns}={self.versions.get(ns)}' for ns in namespaces]
+        key = '|'.join([self.release, request.full_path, *versions])
+        etag = hashlib.sha1(key.encode()).hexdigest()[:20]
+        modified = max(self.versions.modified(ns) for ns in namespaces)
+        return etag, modified
+
+    def _headers(self, response, etag, modified):
+        # A gzipped body is a different representation and needs its own tag
+        if response.content_encoding == 'gzip':
+            etag += '-gzip'
+        response.set_etag(etag)
+        # Bump times are whole seconds, so a page rendered in the same second
+        # as the last bump could be followed by another bump with the same
+        # time; only advertise Last-Modified once that second has passed.
+        if modified < int(time.time()):
+            response.headers['Last-Modified'] = http_date(modified)
+        response.headers['Cache-Control'] = f'public, max-age={self.max_age}, must-revalidate'
+        response.vary.add('Cookie')
+        return response
+
+    def _not_modified(self, etag, modified):
+        if request.if_none_match:
+            return request.if_none_match.contains(etag) or request.if_none_match.contains(etag + '-gzip')
+        since = request.if_modified_since
+        return since is not None and since.timestamp() >= modified
+
+    def __call__(self, *namespaces):
+        def decorate(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET' or is_personal():
+                    response = make_response(view(*args, **kwargs))
+                    response.headers.setdefault('Cache-Control', 'private, no-cache')
+                    return response
+                etag, modified = self.validators(namespaces)
+                if self._not_modified(etag, modified):
+                    return self._headers(make_response('', 304), etag, modified)
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if self.fill_allowed is not None and not self.fill_allowed():
+                    response.headers['Cache-Control'] = 'no-cache'
+                    return response
+                return self._headers(response, etag, modified)
+            return wrapper
+        return decorate
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,5 +14,101 @@ class Config:
     MYSQL_DB = os.environ.get('MYSQL_DB', 'gmu_coding_club')
     MYSQL_PORT = int(os.environ.get('MYSQL_PORT', 3306))
     
+    # Connection pool - sized per worker process
+    MYSQL_POOL_SIZE = int(os.environ.get('MYSQL_POOL_SIZE', 5))
+    MYSQL_POOL_MAX_OVERFLOW = int(os.environ.get('MYSQL_POOL_MAX_OVERFLOW', 10))
+    MYSQL_POOL_MAX_LIFETIME = int(os.environ.get('MYSQL_POOL_MAX_LIFETIME', 1800))
+    MYSQL_POOL_PRE_PING = os.environ.get('MYSQL_POOL_PRE_PING', 'true').lower() == 'true'
+    MYSQL_POOL_TIMEOUT = float(os.environ.get('MYSQL_POOL_TIMEOUT', 10))
+    
+    # Read replicas - comma-separated host[:port] list, same credentials as the
+    # primary. Reads of GET pages go to a healthy replica unless the session
+    # wrote within REPLICA_STICKY_SECONDS.
+    MYSQL_REPLICA_HOSTS = [host for host in os.environ.get('MYSQL_REPLICA_HOSTS', '').split(',') if host.strip()]
+    MYSQL_REPLICA_POOL_SIZE = int(os.environ.get('MYSQL_REPLICA_POOL_SIZE', 5))
+    MYSQL_REPLICA_CONNECT_TIMEOUT = int(os.environ.get('MYSQL_REPLICA_CONNECT_TIMEOUT', 2))
+    MYSQL_REPLICA_MAX_LAG = float(os.environ.get('MYSQL_REPLICA_MAX_LAG', 2))
+    MYSQL_REPLICA_CHECK_INTERVAL = float(os.environ.get('MYSQL_REPLICA_CHECK_INTERVAL', 5))
+    REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    
+    # Parallel reads for the admin dashboard; each call holds a pool connection
+    DB_FANOUT_WORKERS = int(os.environ.get('DB_FANOUT_WORKERS', 8))
+    DB_FANOUT_TIMEOUT = float(os.environ.get('DB_FANOUT_TIMEOUT', 5))
+    
+    # Instrumentation - METRICS_TOKEN lets a Prometheus scraper read /admin/metrics
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Conditional GET for public pages - RELEASE is mixed into ETags so a
+    # deploy with new templates does not answer 304 for old HTML
+    HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', 0))
+    RELEASE = os.environ.get('RELEASE', '')
+    
+    # Rendered page cache for anonymous visitors
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+    PAGE_CACHE_MAX_BYTES = int(os.environ.get('PAGE_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    PAGE_CACHE_COMPRESS = os.environ.get('PAGE_CACHE_COMPRESS', 'true').lower() == 'true'
+    
+    # Newsletter delivery - point SMTP_* at a local debugging server to test
+    SMTP_HOST = os.environ.get('SMTP_HOST', 'localhost')
+    SMTP_PORT = int(os.environ.get('SMTP_PORT', 1025))
+    SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+    SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+    SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'false').lower() == 'true'
+    NEWSLETTER_FROM = os.environ.get('NEWSLETTER_FROM', 'GMU Coding Club <newsletter@localhost>')
+    NEWSLETTER_CONCURRENCY = int(os.environ.get('NEWSLETTER_CONCURRENCY', 4))
+    NEWSLETTER_RATE_PER_SEC = float(os.environ.get('NEWSLETTER_RATE_PER_SEC', 10))
+    NEWSLETTER_BATCH_SIZE = int(os.environ.get('NEWSLETTER_BATCH_SIZE', 200))
+    
+    # Request profiler - samples 1 in PROFILER_SAMPLE_RATE requests (0 = only
+    # admin requests sent with an X-Profile header)
+    PROFILER_SAMPLE_RATE = int(os.environ.get('PROFILER_SAMPLE_RATE', 0))
+    PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', 5))
+    
+    # Query cache - versions are shared by all workers through CACHE_VERSION_DIR
+    CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'true').lower() == 'true'
+    CACHE_TTL = int(os.environ.get('CACHE_TTL', 300))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 256))
+    CACHE_VERSION_DIR = os.environ.get('CACHE_VERSION_DIR', os.path.join(tempfile.gettempdir(), 'gmu_coding_club_cache'))
+    CERTIFICATE_CACHE_SIZE = int(os.environ.get('CERTIFICATE_CACHE_SIZE', 4096))
+    
+    # Batch certificate issuance - documents are rendered on a process pool
+    CERTIFICATE_OUTPUT_DIR = os.environ.get('CERTIFICATE_OUTPUT_DIR', os.path.join(tempfile.gettempdir(), 'gmu_coding_club_certificates'))
+    CERTIFICATE_RENDER_PROCESSES = int(os.environ.get('CERTIFICATE_RENDER_PROCESSES', os.cpu_count() or 1))
+    CERTIFICATE_BATCH_SIZE = int(os.environ.get('CERTIFICATE_BATCH_SIZE', 500))
+    CERTIFICATE_VERIFY_MAX_CODES = int(os.environ.get('CERTIFICATE_VERIFY_MAX_CODES', 500))
+    
+    EVENTS_PAGE_SIZE = int(os.environ.get('EVENTS_PAGE_SIZE', 10))
+    REGISTRATION_RETRIES = int(os.environ.get('REGISTRATION_RETRIES', 3))
+    
+    # Admission queue for registration bursts - off unless a big opening is expected
+    REGISTRATION_QUEUE_ENABLED = os.environ.get('REGISTRATION_QUEUE_ENABLED', 'false').lower() == 'true'
+    REGISTRATION_QUEUE_PATH = os.environ.get('REGISTRATION_QUEUE_PATH', os.path.join(tempfile.gettempdir(), 'gmu_coding_club_admissions.sqlite3'))
+    REGISTRATION_QUEUE_BATCH_SIZE = int(os.environ.get('REGISTRATION_QUEUE_BATCH_SIZE', 50))
+    REGISTRATION_QUEUE_INTERVAL = float(os.environ.get('REGISTRATION_QUEUE_INTERVAL', 0.2))
+    
+    # Password hashing - cost settings apply to new hashes; older hashes are
+    # upgraded on the next successful login
+    PASSWORD_HASH_SCHEME = os.environ.get('PASSWORD_HASH_SCHEME', 'scrypt')
+    PASSWORD_SCRYPT_N = int(os.environ.get('PASSWORD_SCRYPT_N', 2 ** 14))
+    PASSWORD_SCRYPT_R = int(os.environ.get('PASSWORD_SCRYPT_R', 8))
+    PASSWORD_SCRYPT_P = int(os.environ.get('PASSWORD_SCRYPT_P', 1))
+    PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 600000))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 5))
+    
+    # Background jobs - run by `python worker.py`; a claimed job becomes
+    # claimable again if its worker has not finished it within the timeout
+    JOB_VISIBILITY_TIMEOUT = int(os.environ.get('JOB_VISIBILITY_TIMEOUT', 300))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+    JOB_BACKOFF_BASE = float(os.environ.get('JOB_BACKOFF_BASE', 5))
+    JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', 7))
+    WORKER_PROCESSES = int(os.environ.get('WORKER_PROCESSES', 1))
+    WORKER_THREADS = int(os.environ.get('WORKER_THREADS', 4))
+    WORKER_POLL_INTERVAL = float(os.environ.get('WORKER_POLL_INTERVAL', 1))
+    
+    LAST_LOGIN_FLUSH_INTERVAL = float(os.environ.get('LAST_LOGIN_FLUSH_INTERVAL', 5))
+    
     # Event categories
     EVENT_CATEGORIES = ['Workshop', 'Competition', 'Social', 'Meeting', 'Hackathon']
\ No newline at end of file
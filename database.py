@@ -1,26 +1,375 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
+from flask import current_app, g, has_request_context, request, session
 from config import Config
-import hashlib
+from pool import ConnectionPool, PoolTimeout
+from replicas import ReplicaSet, parse_hosts, routed_reads
+from cache import QueryCache, VersionStore
+from migrations import run_migrations
+from passwords import hasher
+from write_behind import LastLoginBuffer
+from metrics import InstrumentedCursor, acquire_duration, instrument_methods
+from certificate_codes import CertificateSigner, LEGACY_PATTERN, SIGNED_PATTERN
+from datetime import date
 import json
+import logging
+import random
+import secrets
+import time
 
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+CACHE_NAMESPACES = ('events', 'projects', 'certifications')
+RETRYABLE_ERRORS = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)
+
+# Rows are inserted under a random code like GMU-7K3D-Q9XA (40 bits, no 0/O
+# or 1/I), which is swapped for a signed code once the id is known
+CODE_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+CODE_ATTEMPTS = 5
+
+def new_certificate_code():
+    return 'GMU-' + '-'.join(''.join(secrets.choice(CODE_ALPHABET) for _ in range(4)) for _ in range(2))
+
+def parse_issue_date(value):
+    if not value:
+        return date.today()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+# Statements on the hot paths. `migrations.py --check` EXPLAINs these same
+# strings (see hot_queries there), so keep the SQL here rather than inline.
+EVENT_CATEGORIES_SQL = "SELECT DISTINCT category FROM events WHERE is_active = TRUE ORDER BY category"
+PROJECT_COLUMNS = "id, title, description, category, github_url, is_active, created_by, created_at"
+PROJECT_CATEGORIES_SQL = "SELECT DISTINCT category FROM projects WHERE is_active = TRUE"
+NEWSLETTER_RECIPIENTS_SQL = """
+    SELECT id, name, email, major, academic_year FROM club_members
+    WHERE newsletter_subscription = TRUE AND id > %s
+    ORDER BY id LIMIT %s
+"""
+ADMIN_LOGIN_SQL = "SELECT id, username, email, full_name, role, password_hash FROM admin_users WHERE username = %s AND is_active = TRUE"
+USER_LOGIN_SQL = """
+    SELECT id, username, email, full_name, role, password_hash
+    FROM users
+    WHERE username = %s AND is_active = TRUE
+"""
+CERTIFICATION_BY_CODE_SQL = "SELECT * FROM certifications WHERE certificate_code = %s"
+REVOKED_CERTIFICATIONS_SQL = "SELECT id FROM certifications WHERE revoked_at IS NOT NULL"
+USER_CERTIFICATIONS_SQL = "SELECT * FROM certifications WHERE user_id = %s ORDER BY issue_date DESC, id DESC"
+ALL_CERTIFICATIONS_SQL = "SELECT * FROM certifications ORDER BY issue_date DESC, id DESC LIMIT %s"
+
+def events_page_query(category=None, after=None, limit=10):
+    # Keyset pagination over (date, time, id); `after` is the last row of
+    # the previous page so deep pages cost the same as the first one.
+    query = "SELECT * FROM events WHERE is_active = TRUE"
+    params = []
+    if category:
+        query += " AND category = %s"
+        params.append(category)
+    if after:
+        after_date, after_time, after_id = after
+        query += " AND (date > %s OR (date = %s AND (time > %s OR (time = %s AND id > %s))))"
+        params.extend([after_date, after_date, after_time, after_time, after_id])
+    query += " ORDER BY date, time, id LIMIT %s"
+    params.append(limit)
+    return query, tuple(params)
+
+def projects_query(category='all', tech=None):
+    # Tags come from project_technologies rather than decoding the JSON
+    # column; the tech filter is a semi-join on the tag index
+    query = f"SELECT {PROJECT_COLUMNS} FROM projects WHERE is_active = TRUE"
+    params = []
+    if category != 'all':
+        query += " AND category = %s"
+        params.append(category)
+    if tech:
+        query += " AND id IN (SELECT project_id FROM project_technologies WHERE tag = %s)"
+        params.append(tech)
+    query += " ORDER BY created_at DESC"
+    return query, tuple(params)
+
+def project_technologies_query(project_ids):
+    return (
+        f"SELECT project_id, tag FROM project_technologies WHERE project_id IN ({', '.join(['%s'] * len(project_ids))}) ORDER BY project_id, position",
+        tuple(project_ids)
+    )
+
+def registrations_query(event_id=None, since=None, until=None):
+    query = """
+        SELECT er.*, e.title as event_title
+        FROM event_registrations er
+        JOIN events e ON er.event_id = e.id
+        WHERE 1 = 1
+    """
+    params = []
+    if event_id:
+        query += " AND er.event_id = %s"
+        params.append(event_id)
+    if since:
+        query += " AND er.registration_date >= %s"
+        params.append(since)
+    if until:
+        query += " AND er.registration_date < %s"
+        params.append(until)
+    query += " ORDER BY er.registration_date DESC"
+    return query, tuple(params)
+
+class RequestConnection:
+    # Shared by every Database call within one request. Methods keep calling
+    # commit()/close() as usual; the real commit happens once, after the view
+    # returns, and the connection goes back to the pool at teardown.
+    def __init__(self, connection):
+        self._connection = connection
+        self.dirty = False
+        self.on_commit = []
+    
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+    
+    def commit(self):
+        self.dirty = True
+    
+    def rollback(self):
+        self._connection.rollback()
+        self.dirty = False
+        self.on_commit = []
+    
+    def close(self):
+        pass
+    
+    def finish(self, commit):
+        try:
+            if commit and self.dirty:
+                self._connection.commit()
+                for callback in self.on_commit:
+                    callback()
+        finally:
+            self.dirty = False
+            self.on_commit = []
+            self._connection.close()
+
+@instrument_methods(exclude=('init_app', 'get_connection', 'read_routing', 'use_replica', 'cache_fills_allowed',
+                             'pool_stats', 'replica_stats', 'cache_stats'))
 class Database:
     def __init__(self):
         self.config = Config()
+        self.pool = ConnectionPool(
+            self._connect,
+            size=self.config.MYSQL_POOL_SIZE,
+            max_overflow=self.config.MYSQL_POOL_MAX_OVERFLOW,
+            max_lifetime=self.config.MYSQL_POOL_MAX_LIFETIME,
+            pre_ping=self.config.MYSQL_POOL_PRE_PING,
+            timeout=self.config.MYSQL_POOL_TIMEOUT,
+            cursor_wrapper=InstrumentedCursor
+        )
+        self.replicas = None
+        if self.config.MYSQL_REPLICA_HOSTS:
+            self.replicas = ReplicaSet(
+                parse_hosts(self.config.MYSQL_REPLICA_HOSTS, self.config.MYSQL_PORT),
+                self._connect_replica,
+                dict(
+                    size=self.config.MYSQL_REPLICA_POOL_SIZE,
+                    max_overflow=self.config.MYSQL_POOL_MAX_OVERFLOW,
+                    max_lifetime=self.config.MYSQL_POOL_MAX_LIFETIME,
+                    pre_ping=self.config.MYSQL_POOL_PRE_PING,
+                    timeout=self.config.MYSQL_POOL_TIMEOUT,
+                    cursor_wrapper=InstrumentedCursor
+                ),
+                interval=self.config.MYSQL_REPLICA_CHECK_INTERVAL,
+                max_lag=self.config.MYSQL_REPLICA_MAX_LAG
+            )
+        self.last_logins = LastLoginBuffer(self.flush_last_logins, interval=self.config.LAST_LOGIN_FLUSH_INTERVAL)
+        self.cache = QueryCache(
+            VersionStore(self.config.CACHE_VERSION_DIR),
+            max_entries=self.config.CACHE_MAX_ENTRIES,
+            ttl=self.config.CACHE_TTL,
+            enabled=self.config.CACHE_ENABLED,
+            fill_allowed=self.cache_fills_allowed,
+            snapshot_version=self.snapshot_version
+        )
+        # Certificate lookups get their own LRU so a burst of verification
+        # links cannot push event and project listings out of the query cache
+        self.certificates = QueryCache(
+            self.cache.versions,
+            max_entries=self.config.CERTIFICATE_CACHE_SIZE,
+            ttl=self.config.CACHE_TTL,
+            enabled=self.config.CACHE_ENABLED,
+            fill_allowed=self.cache_fills_allowed,
+            snapshot_version=self.snapshot_version
+        )
+        self.signer = CertificateSigner(self.config.SECRET_KEY)
+        # Called as listener(namespace, ids) after each committed write; ids
+        # are the rows whose searchable content changed, None if unknown
+        self.listeners = []
+    
+    def _connect(self):
+        return mysql.connector.connect(
+            host=self.config.MYSQL_HOST,
+            user=self.config.MYSQL_USER,
+            password=self.config.MYSQL_PASSWORD,
+            database=self.config.MYSQL_DB,
+            port=self.config.MYSQL_PORT
+        )
+    
+    def _connect_replica(self, host, port):
+        return mysql.connector.connect(
+            host=host,
+            user=self.config.MYSQL_USER,
+            password=self.config.MYSQL_PASSWORD,
+            database=self.config.MYSQL_DB,
+            port=port,
+            connection_timeout=self.config.MYSQL_REPLICA_CONNECT_TIMEOUT
+        )
     
-    def get_connection(self):
+    def init_app(self, app):
+        app.after_request(self._commit_request)
+        app.teardown_request(self._end_request)
+    
+    def get_connection(self, scoped=True, readonly=False):
+        # readonly=True marks a method that only reads; it may then be served
+        # by a replica (see use_replica), falling back to the primary.
+        if readonly and self.use_replica():
+            connection = self._replica_connection(scoped and has_request_context())
+            if connection is not None:
+                return connection
+        if scoped and has_request_context():
+            connection = g.get('_db_connection')
+            if connection is None:
+                connection = self._begin_request()
+            return connection
+        started = time.perf_counter()
         try:
-            connection = mysql.connector.connect(
-                host=self.config.MYSQL_HOST,
-                user=self.config.MYSQL_USER,
-                password=self.config.MYSQL_PASSWORD,
-                database=self.config.MYSQL_DB,
-                port=self.config.MYSQL_PORT
-            )
+            return self.pool.acquire()
+        except (PoolTimeout, Error) as e:
+            logger.error(f"Error connecting to MySQL: {e}")
+            return None
+        finally:
+            acquire_duration.observe(time.perf_counter() - started)
+    
+    def read_routing(self):
+        # (read from a replica, cache what was read), decided once per request
+        # so every read of a page comes from the same place. Replicas serve
+        # safe requests only, so a POST sees its own transaction, and not a
+        # session that wrote recently. A replica may not have caught up with
+        # a bump of a cached namespace (stored in whole seconds) yet, so what
+        # it returns inside that window is served but never cached.
+        if self.replicas is None:
+            return False, True
+        if not has_request_context():
+            return routed_reads.get() or (False, True)
+        if '_db_read_routing' not in g:
+            horizon = time.time() - self.config.REPLICA_STICKY_SECONDS
+            replica = request.method in SAFE_METHODS and session.get('db_write_at', 0) <= horizon
+            settled = all(self.cache.versions.modified(namespace) + 1 <= horizon for namespace in CACHE_NAMESPACES)
+            g._db_read_routing = (replica, settled or not replica)
+        return g._db_read_routing
+    
+    def use_replica(self):
+        return self.read_routing()[0]
+    
+    def cache_fills_allowed(self):
+        return self.read_routing()[1]
+    
+    def _replica_connection(self, scoped):
+        if scoped:
+            connection = g.get('_db_replica')
+            if connection is not None:
+                return connection
+        started = time.perf_counter()
+        connection = self.replicas.acquire()
+        acquire_duration.observe(time.perf_counter() - started)
+        if connection is None or not scoped:
             return connection
+        self._pin_snapshot_versions()
+        try:
+            connection.start_transaction(consistent_snapshot=True, readonly=True)
+        except Error as e:
+            logger.error(f"Error starting replica transaction: {e}")
+            connection.close()
+            return None
+        g._db_replica = RequestConnection(connection)
+        return g._db_replica
+    
+    def _begin_request(self):
+        connection = self.get_connection(scoped=False)
+        if connection is None:
+            return None
+        self._pin_snapshot_versions()
+        try:
+            # Safe methods read from one snapshot for the whole page
+            connection.start_transaction(
+                consistent_snapshot=True,
+                readonly=request.method in SAFE_METHODS
+            )
         except Error as e:
-            print(f"Error connecting to MySQL: {e}")
+            logger.error(f"Error starting request transaction: {e}")
+            connection.close()
+            return None
+        g._db_connection = RequestConnection(connection)
+        return g._db_connection
+    
+    def _pin_snapshot_versions(self):
+        # Read before the request's first snapshot starts: a write committed
+        # after that point bumps past these, and rows read from the snapshot
+        # must not be cached under the newer version (see QueryCache.store).
+        if '_db_snapshot_versions' not in g:
+            g._db_snapshot_versions = {namespace: self.cache.versions.get(namespace) for namespace in CACHE_NAMESPACES}
+    
+    def snapshot_version(self, namespace):
+        if not has_request_context():
             return None
+        return g.get('_db_snapshot_versions', {}).get(namespace)
+    
+    def _commit_request(self, response):
+        replica = g.pop('_db_replica', None)
+        if replica is not None:
+            replica.finish(commit=False)
+        connection = g.pop('_db_connection', None)
+        if connection is None:
+            return response
+        wrote = connection.dirty and response.status_code < 500
+        try:
+            connection.finish(commit=response.status_code < 500)
+        except Error as e:
+            logger.error(f"Error committing request transaction: {e}")
+            return current_app.response_class('Database error, please try again.', status=500)
+        if wrote and self.replicas is not None:
+            # Read your own writes: this session reads from the primary for a while
+            session['db_write_at'] = time.time()
+        return response
+    
+    def _end_request(self, exc=None):
+        for name in ('_db_replica', '_db_connection'):
+            connection = g.pop(name, None)
+            if connection is not None:
+                connection.finish(commit=False)
+    
+    def pool_stats(self):
+        return self.pool.stats()
+    
+    def replica_stats(self):
+        return self.replicas.stats() if self.replicas is not None else {}
+    
+    def cache_stats(self):
+        return self.cache.stats()
+    
+    def _invalidate(self, connection, *namespaces, ids=None):
+        # Inside a request the bump must wait for the real commit, otherwise
+        # another worker could re-cache the pre-commit rows under the new version.
+        def bump():
+            self.cache.invalidate(*namespaces, content=ids != ())
+            for listener in self.listeners:
+                for namespace in namespaces:
+                    try:
+                        listener(namespace, ids)
+                    except Exception as e:
+                        logger.error(f"Error notifying change listener: {e}")
+        
+        if isinstance(connection, RequestConnection):
+            connection.on_commit.append(bump)
+        else:
+            bump()
     
     def initialize_database(self):
         connection = self.get_connection()
@@ -40,7 +389,7 @@ class Database:
                 if connection is None:
                     return False
             except Error as e:
-                print(f"Error creating database: {e}")
+                logger.error(f"Error creating database: {e}")
                 return False
         
         cursor = connection.cursor()
@@ -148,7 +497,7 @@ class Database:
                     ('projects_manager', 'projects123', 'projects@gmucodingclub.com', 'Projects Coordinator', 'moderator')
                 ]
                 for username, password, email, full_name, role in admin_users:
-                    password_hash = hashlib.sha256(password.encode()).hexdigest()
+                    password_hash = hasher.hash(password)
                     cursor.execute(
                         "INSERT INTO admin_users (username, password_hash, email, full_name, role) VALUES (%s, %s, %s, %s, %s)",
                         (username, password_hash, email, full_name, role)
@@ -163,7 +512,7 @@ class Database:
                     ('mike_wilson', 'student123', 'mwilson@gmu.edu', 'Mike Wilson', 'Data Science', 'Sophomore', 'G12345680', 'executive')
                 ]
                 for username, password, email, full_name, major, year, gmu_id, role in student_users:
-                    password_hash = hashlib.sha256(password.encode()).hexdigest()
+                    password_hash = hasher.hash(password)
                     cursor.execute(
                         "INSERT INTO users (username, password_hash, email, full_name, major, academic_year, gmu_id, role) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
                         (username, password_hash, email, full_name, major, year, gmu_id, role)
@@ -198,6 +547,7 @@ class Database:
                     )
             
             connection.commit()
+            run_migrations(connection)
             print("✅ Database initialized successfully!")
             return True
             
@@ -209,7 +559,11 @@ class Database:
             connection.close()
     
     def get_all_events(self, active_only=True):
-        connection = self.get_connection()
+        hit, events, version = self.cache.lookup('events', ('all', active_only))
+        if hit:
+            return list(events)
+        
+        connection = self.get_connection(readonly=True)
         if connection is None:
             return []
         
@@ -219,16 +573,67 @@ class Database:
                 cursor.execute("SELECT * FROM events WHERE is_active = TRUE ORDER BY date, time")
             else:
                 cursor.execute("SELECT * FROM events ORDER BY date, time")
-            return cursor.fetchall()
+            events = cursor.fetchall()
+            self.cache.store('events', ('all', active_only), events, version)
+            return list(events)
+        except Error as e:
+            logger.error(f"Error getting events: {e}")
+            return []
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_events(self, category=None, limit=10, after=None):
+        # Only first pages are cached: cursors come from URLs, and every
+        # one would otherwise be a cache entry of its own.
+        key = ('page', category, limit)
+        if after is None:
+            hit, events, version = self.cache.lookup('events', key)
+            if hit:
+                return list(events)
+        
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return []
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(*events_page_query(category, after, limit))
+            events = cursor.fetchall()
+            if after is None:
+                self.cache.store('events', key, events, version)
+            return list(events)
         except Error as e:
-            print(f"Error getting events: {e}")
+            logger.error(f"Error getting events: {e}")
+            return []
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_event_categories(self):
+        hit, categories, version = self.cache.lookup('events', ('categories',))
+        if hit:
+            return list(categories)
+        
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return []
+        
+        cursor = connection.cursor()
+        try:
+            cursor.execute(EVENT_CATEGORIES_SQL)
+            categories = [row[0] for row in cursor.fetchall()]
+            self.cache.store('events', ('categories',), categories, version)
+            return list(categories)
+        except Error as e:
+            logger.error(f"Error getting event categories: {e}")
             return []
         finally:
             cursor.close()
             connection.close()
     
     def get_event_by_id(self, event_id):
-        connection = self.get_connection()
+        connection = self.get_connection(readonly=True)
         if connection is None:
             return None
         
@@ -237,7 +642,7 @@ class Database:
             cursor.execute("SELECT * FROM events WHERE id = %s", (event_id,))
             return cursor.fetchone()
         except Error as e:
-            print(f"Error getting event: {e}")
+            logger.error(f"Error getting event: {e}")
             return None
         finally:
             cursor.close()
@@ -263,9 +668,10 @@ class Database:
                 event_data['max_participants']
             ))
             connection.commit()
+            self._invalidate(connection, 'events', ids=[cursor.lastrowid])
             return True
         except Error as e:
-            print(f"Error adding event: {e}")
+            logger.error(f"Error adding event: {e}")
             return False
         finally:
             cursor.close()
@@ -280,9 +686,10 @@ class Database:
         try:
             cursor.execute("UPDATE events SET is_active = %s WHERE id = %s", (is_active, event_id))
             connection.commit()
+            self._invalidate(connection, 'events', ids=())
             return cursor.rowcount > 0
         except Error as e:
-            print(f"Error updating event status: {e}")
+            logger.error(f"Error updating event status: {e}")
             return False
         finally:
             cursor.close()
@@ -297,35 +704,71 @@ class Database:
         try:
             cursor.execute("DELETE FROM events WHERE id = %s", (event_id,))
             connection.commit()
+            self._invalidate(connection, 'events', ids=[event_id])
             return cursor.rowcount > 0
         except Error as e:
-            print(f"Error deleting event: {e}")
+            logger.error(f"Error deleting event: {e}")
             return False
         finally:
             cursor.close()
             connection.close()
     
     def register_for_event(self, event_id, registration_data):
-        connection = self.get_connection()
+        return self.register_batch([(event_id, registration_data)])[0]
+    
+    def register_batch(self, registrations):
+        # Returns a (success, message) result per (event_id, data) pair. Each
+        # pair is its own transaction on a connection outside the request,
+        # committed right after the INSERT, so the event row lock is held for
+        # two statements rather than until the request commits, and a retry
+        # never rolls back the request's other writes.
+        connection = self.get_connection(scoped=False)
         if connection is None:
-            return False, "Database connection failed"
+            return [(False, "Database connection failed")] * len(registrations)
         
         cursor = connection.cursor()
         try:
-            cursor.execute("SELECT max_participants, current_participants FROM events WHERE id = %s AND is_active = TRUE", (event_id,))
-            event = cursor.fetchone()
-            
-            if not event:
-                return False, "Event not found or not active"
-            
-            max_participants, current_participants = event
-            if current_participants >= max_participants:
-                return False, "Event is full"
-            
-            cursor.execute("SELECT id FROM event_registrations WHERE event_id = %s AND email = %s", (event_id, registration_data['email']))
+            results = [self._register_committed(connection, cursor, event_id, data) for event_id, data in registrations]
+        finally:
+            cursor.close()
+            connection.close()
+        if any(success for success, _ in results):
+            # Seat counts are not searchable
+            self._invalidate(connection, 'events', ids=())
+        return results
+    
+    def _register_committed(self, connection, cursor, event_id, registration_data):
+        retries = self.config.REGISTRATION_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                result = self._register_one(cursor, event_id, registration_data)
+                connection.commit()
+                return result
+            except Error as e:
+                try:
+                    connection.rollback()
+                except Error:
+                    pass
+                if e.errno not in RETRYABLE_ERRORS or attempt == retries:
+                    logger.error(f"Error registering for event: {e}")
+                    return False, "Registration failed"
+                time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+    
+    def _register_one(self, cursor, event_id, registration_data):
+        # The conditional UPDATE takes the event row lock and claims a seat in
+        # one statement, so concurrent signups cannot overfill the event.
+        # Duplicates are caught by unique_event_email on the INSERT.
+        cursor.execute("""
+            UPDATE events SET current_participants = current_participants + 1
+            WHERE id = %s AND is_active = TRUE AND current_participants < max_participants
+        """, (event_id,))
+        if cursor.rowcount == 0:
+            cursor.execute("SELECT id FROM events WHERE id = %s AND is_active = TRUE", (event_id,))
             if cursor.fetchone():
-                return False, "Already registered for this event"
-            
+                return False, "Event is full"
+            return False, "Event not found or not active"
+        
+        try:
             cursor.execute("""
                 INSERT INTO event_registrations (event_id, name, email, major, academic_year)
                 VALUES (%s, %s, %s, %s, %s)
@@ -336,49 +779,151 @@ class Database:
                 registration_data.get('major'),
                 registration_data.get('year')
             ))
-            
-            cursor.execute("UPDATE events SET current_participants = current_participants + 1 WHERE id = %s", (event_id,))
-            
-            connection.commit()
-            return True, "Registration successful"
-            
         except Error as e:
-            print(f"Error registering for event: {e}")
+            if e.errno in RETRYABLE_ERRORS:
+                raise
+            # Only the failed statement is rolled back; give the seat back too
+            cursor.execute("UPDATE events SET current_participants = current_participants - 1 WHERE id = %s", (event_id,))
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                return False, "Already registered for this event"
+            logger.error(f"Error registering for event: {e}")
             return False, "Registration failed"
+        return True, "Registration successful"
+    
+    def get_event_registrations(self, event_id=None):
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return []
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(*registrations_query(event_id))
+            return cursor.fetchall()
+        except Error as e:
+            logger.error(f"Error getting registrations: {e}")
+            return []
         finally:
             cursor.close()
             connection.close()
     
-    def get_event_registrations(self, event_id=None):
-        connection = self.get_connection()
+    def get_dashboard_stats(self):
+        stats = self.get_dashboard_totals()
+        stats['event_fill'] = self.get_event_fill_ratios()
+        stats['categories'] = self.get_registrations_by_category()
+        return stats
+    
+    def get_dashboard_totals(self):
+        # Registration totals come from the per-event counters maintained by
+        # the registration path, so the cost does not grow with signups.
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return {}
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM events) AS total_events,
+                    (SELECT COUNT(*) FROM events WHERE is_active = TRUE) AS active_events,
+                    (SELECT COUNT(*) FROM events WHERE is_active = TRUE AND date >= CURDATE()) AS upcoming_events,
+                    (SELECT COALESCE(SUM(current_participants), 0) FROM events) AS total_registrations,
+                    (SELECT COUNT(*) FROM club_members) AS total_members,
+                    (SELECT COUNT(*) FROM users) AS total_users
+            """)
+            return cursor.fetchone()
+        except Error as e:
+            logger.error(f"Error getting dashboard totals: {e}")
+            return {}
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_event_fill_ratios(self, limit=5):
+        connection = self.get_connection(readonly=True)
         if connection is None:
             return []
         
         cursor = connection.cursor(dictionary=True)
         try:
-            if event_id:
-                cursor.execute("""
-                    SELECT er.*, e.title as event_title 
-                    FROM event_registrations er 
-                    JOIN events e ON er.event_id = e.id 
-                    WHERE er.event_id = %s 
-                    ORDER BY er.registration_date DESC
-                """, (event_id,))
-            else:
-                cursor.execute("""
-                    SELECT er.*, e.title as event_title 
-                    FROM event_registrations er 
-                    JOIN events e ON er.event_id = e.id 
-                    ORDER BY er.registration_date DESC
-                """)
+            cursor.execute("""
+                SELECT id, title, current_participants, max_participants,
+                       current_participants / max_participants AS fill_ratio
+                FROM events
+                WHERE is_active = TRUE
+                ORDER BY fill_ratio DESC
+                LIMIT %s
+            """, (limit,))
+            return cursor.fetchall()
+        except Error as e:
+            logger.error(f"Error getting event fill ratios: {e}")
+            return []
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_registrations_by_category(self):
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return []
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT category, COUNT(*) AS events, COALESCE(SUM(current_participants), 0) AS registrations
+                FROM events
+                GROUP BY category
+                ORDER BY registrations DESC
+            """)
             return cursor.fetchall()
         except Error as e:
-            print(f"Error getting registrations: {e}")
+            logger.error(f"Error getting registrations by category: {e}")
             return []
         finally:
             cursor.close()
             connection.close()
     
+    def iter_registrations(self, event_id=None, since=None, until=None, batch_size=1000):
+        query, params = registrations_query(event_id, since, until)
+        return self._stream(query, params, batch_size)
+    
+    def iter_club_members(self, since=None, until=None, batch_size=1000):
+        query = "SELECT * FROM club_members WHERE 1 = 1"
+        params = []
+        if since:
+            query += " AND join_date >= %s"
+            params.append(since)
+        if until:
+            query += " AND join_date < %s"
+            params.append(until)
+        query += " ORDER BY id"
+        return self._stream(query, params, batch_size)
+    
+    def _stream(self, query, params, batch_size):
+        # Yields lists of rows from an unbuffered cursor, so the result set is
+        # read off the socket as it is consumed instead of being loaded whole.
+        # Uses its own connection: the generator can outlive the request and
+        # an unbuffered cursor would block other queries on a shared one.
+        connection = self.get_connection(scoped=False, readonly=True)
+        if connection is None:
+            return
+        
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute(query, tuple(params))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        except Error as e:
+            logger.error(f"Error streaming rows: {e}")
+        finally:
+            try:
+                cursor.close()
+            except Error:
+                pass
+            connection.close()
+    
     def add_club_member(self, member_data):
         connection = self.get_connection()
         if connection is None:
@@ -402,50 +947,238 @@ class Database:
             connection.commit()
             return True
         except Error as e:
-            print(f"Error adding member: {e}")
+            logger.error(f"Error adding member: {e}")
             return False
         finally:
             cursor.close()
             connection.close()
     
-    def get_all_projects(self, category='all'):
+    def get_newsletter_recipients(self, after_id=0, limit=500):
+        # Keyset pages over subscribed members, so a sender can checkpoint
+        # the last id and resume
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return []
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(NEWSLETTER_RECIPIENTS_SQL, (after_id, limit))
+            return cursor.fetchall()
+        except Error as e:
+            logger.error(f"Error getting newsletter recipients: {e}")
+            return []
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def create_campaign(self, subject, body):
+        connection = self.get_connection()
+        if connection is None:
+            return None
+        
+        cursor = connection.cursor()
+        try:
+            cursor.execute("INSERT INTO newsletter_campaigns (subject, body) VALUES (%s, %s)", (subject, body))
+            connection.commit()
+            return cursor.lastrowid
+        except Error as e:
+            logger.error(f"Error creating newsletter campaign: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_campaign(self, campaign_id):
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return None
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT * FROM newsletter_campaigns WHERE id = %s", (campaign_id,))
+            return cursor.fetchone()
+        except Error as e:
+            logger.error(f"Error getting newsletter campaign: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def save_campaign_progress(self, campaign_id, last_member_id, sent, failed, status):
         connection = self.get_connection()
+        if connection is None:
+            return False
+        
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                UPDATE newsletter_campaigns SET last_member_id = %s, sent = %s, failed = %s, status = %s
+                WHERE id = %s
+            """, (last_member_id, sent, failed, status, campaign_id))
+            connection.commit()
+            return True
+        except Error as e:
+            logger.error(f"Error saving newsletter progress: {e}")
+            return False
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_all_projects(self, category='all', tech=None):
+        key = ('list', category, tech)
+        hit, projects, version = self.cache.lookup('projects', key)
+        if hit:
+            return list(projects)
+        
+        connection = self.get_connection(readonly=True)
         if connection is None:
             return []
         
         cursor = connection.cursor(dictionary=True)
         try:
-            if category == 'all':
-                cursor.execute("SELECT * FROM projects WHERE is_active = TRUE ORDER BY created_at DESC")
-            else:
-                cursor.execute("SELECT * FROM projects WHERE category = %s AND is_active = TRUE ORDER BY created_at DESC", (category,))
-            
+            cursor.execute(*projects_query(category, tech))
             projects = cursor.fetchall()
-            for project in projects:
-                if project['technologies']:
-                    try:
-                        project['technologies'] = json.loads(project['technologies'])
-                    except:
-                        project['technologies'] = []
-            return projects
+            self._attach_technologies(cursor, projects)
+            self.cache.store('projects', key, projects, version)
+            return list(projects)
         except Error as e:
-            print(f"Error getting projects: {e}")
+            logger.error(f"Error getting projects: {e}")
             return []
         finally:
             cursor.close()
             connection.close()
     
-    def get_project_categories(self):
+    def _attach_technologies(self, cursor, projects):
+        for project in projects:
+            project['technologies'] = []
+        if not projects:
+            return
+        by_id = {project['id']: project for project in projects}
+        cursor.execute(*project_technologies_query(list(by_id)))
+        for row in cursor.fetchall():
+            by_id[row['project_id']]['technologies'].append(row['tag'])
+    
+    def get_project_by_id(self, project_id):
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return None
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(
+                f"SELECT {PROJECT_COLUMNS} FROM projects WHERE id = %s AND is_active = TRUE",
+                (project_id,)
+            )
+            project = cursor.fetchone()
+            if project:
+                self._attach_technologies(cursor, [project])
+            return project
+        except Error as e:
+            logger.error(f"Error getting project: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_project_facets(self):
+        # Project counts per technology, overall and within each category,
+        # from one ROLLUP query
+        hit, facets, version = self.cache.lookup('projects', ('facets',))
+        if hit:
+            return facets
+        
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return {'technologies': [], 'by_category': {}}
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT pt.tag, p.category, COUNT(*) AS projects
+                FROM project_technologies pt
+                JOIN projects p ON p.id = pt.project_id
+                WHERE p.is_active = TRUE
+                GROUP BY pt.tag, p.category WITH ROLLUP
+            """)
+            facets = {'technologies': [], 'by_category': {}}
+            for row in cursor.fetchall():
+                if row['tag'] is None:
+                    continue
+                entry = {'tag': row['tag'], 'projects': row['projects']}
+                if row['category'] is None:
+                    facets['technologies'].append(entry)
+                else:
+                    facets['by_category'].setdefault(row['category'], []).append(entry)
+            for entries in [facets['technologies'], *facets['by_category'].values()]:
+                entries.sort(key=lambda entry: (-entry['projects'], entry['tag']))
+            self.cache.store('projects', ('facets',), facets, version)
+            return facets
+        except Error as e:
+            logger.error(f"Error getting project facets: {e}")
+            return {'technologies': [], 'by_category': {}}
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def add_project(self, project_data):
         connection = self.get_connection()
+        if connection is None:
+            return False
+        
+        # Case-insensitive de-duplication, first spelling wins
+        technologies = []
+        for tag in project_data.get('technologies') or []:
+            tag = tag.strip()
+            if tag and tag.lower() not in {t.lower() for t in technologies}:
+                technologies.append(tag)
+        
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO projects (title, description, technologies, category, github_url, created_by)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, (
+                project_data['title'],
+                project_data['description'],
+                json.dumps(technologies),
+                project_data['category'],
+                project_data.get('github_url'),
+                project_data.get('created_by')
+            ))
+            project_id = cursor.lastrowid
+            if technologies:
+                cursor.executemany(
+                    "INSERT INTO project_technologies (project_id, position, tag) VALUES (%s, %s, %s)",
+                    [(project_id, position, tag) for position, tag in enumerate(technologies, 1)]
+                )
+            connection.commit()
+            self._invalidate(connection, 'projects', ids=[project_id])
+            return True
+        except Error as e:
+            connection.rollback()
+            logger.error(f"Error adding project: {e}")
+            return False
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_project_categories(self):
+        hit, categories, version = self.cache.lookup('projects', ('categories',))
+        if hit:
+            return list(categories)
+        
+        connection = self.get_connection(readonly=True)
         if connection is None:
             return []
         
         cursor = connection.cursor()
         try:
-            cursor.execute("SELECT DISTINCT category FROM projects WHERE is_active = TRUE")
-            return [row[0] for row in cursor.fetchall()]
+            cursor.execute(PROJECT_CATEGORIES_SQL)
+            categories = [row[0] for row in cursor.fetchall()]
+            self.cache.store('projects', ('categories',), categories, version)
+            return list(categories)
         except Error as e:
-            print(f"Error getting categories: {e}")
+            logger.error(f"Error getting categories: {e}")
             return []
         finally:
             cursor.close()
@@ -458,23 +1191,49 @@ class Database:
         
         cursor = connection.cursor(dictionary=True)
         try:
-            cursor.execute("SELECT id, username, email, full_name, role, password_hash FROM admin_users WHERE username = %s AND is_active = TRUE", (username,))
+            cursor.execute(ADMIN_LOGIN_SQL, (username,))
             result = cursor.fetchone()
             
             if result:
-                input_hash = hashlib.sha256(password.encode()).hexdigest()
-                if input_hash == result['password_hash']:
-                    cursor.execute("UPDATE admin_users SET last_login = CURRENT_TIMESTAMP WHERE id = %s", (result['id'],))
-                    connection.commit()
+                matches, needs_rehash = hasher.verify(password, result.pop('password_hash'))
+                if matches:
+                    if needs_rehash:
+                        cursor.execute("UPDATE admin_users SET password_hash = %s WHERE id = %s", (hasher.hash(password), result['id']))
+                        connection.commit()
+                    self.last_logins.record('admin_users', result['id'])
                     return result
             return None
         except Error as e:
-            print(f"Error verifying admin: {e}")
+            logger.error(f"Error verifying admin: {e}")
             return None
         finally:
             cursor.close()
             connection.close()
     
+    def flush_last_logins(self, pending):
+        # One UPDATE per table for everything recorded since the last flush.
+        # Raises on failure so the buffer can keep the entries for next time.
+        connection = self.get_connection(scoped=False)
+        if connection is None:
+            raise RuntimeError("Database connection failed")
+        
+        cursor = connection.cursor()
+        try:
+            for table, entries in pending.items():
+                if table not in ('users', 'admin_users'):
+                    continue
+                ids = list(entries)
+                cases = ' '.join(['WHEN %s THEN FROM_UNIXTIME(%s)'] * len(ids))
+                params = [value for row_id in ids for value in (row_id, entries[row_id])]
+                cursor.execute(
+                    f"UPDATE {table} SET last_login = CASE id {cases} END WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                    tuple(params + ids)
+                )
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+    
     def create_user(self, user_data):
         connection = self.get_connection()
         if connection is None:
@@ -482,7 +1241,7 @@ class Database:
         
         cursor = connection.cursor()
         try:
-            password_hash = hashlib.sha256(user_data['password'].encode()).hexdigest()
+            password_hash = hasher.hash(user_data['password'])
             cursor.execute("""
                 INSERT INTO users (username, password_hash, email, full_name, major, academic_year, gmu_id, role)
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
@@ -499,7 +1258,7 @@ class Database:
             connection.commit()
             return True, "User created successfully"
         except Error as e:
-            print(f"Error creating user: {e}")
+            logger.error(f"Error creating user: {e}")
             return False, "Username or email already exists"
         finally:
             cursor.close()
@@ -512,29 +1271,27 @@ class Database:
         
         cursor = connection.cursor(dictionary=True)
         try:
-            cursor.execute("""
-                SELECT id, username, email, full_name, role, password_hash 
-                FROM users 
-                WHERE username = %s AND is_active = TRUE
-            """, (username,))
+            cursor.execute(USER_LOGIN_SQL, (username,))
             result = cursor.fetchone()
             
             if result:
-                input_hash = hashlib.sha256(password.encode()).hexdigest()
-                if input_hash == result['password_hash']:
-                    cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s", (result['id'],))
-                    connection.commit()
+                matches, needs_rehash = hasher.verify(password, result.pop('password_hash'))
+                if matches:
+                    if needs_rehash:
+                        cursor.execute("UPDATE users SET password_hash = %s WHERE id = %s", (hasher.hash(password), result['id']))
+                        connection.commit()
+                    self.last_logins.record('users', result['id'])
                     return result
             return None
         except Error as e:
-            print(f"Error verifying user: {e}")
+            logger.error(f"Error verifying user: {e}")
             return None
         finally:
             cursor.close()
             connection.close()
     
     def get_user_by_id(self, user_id):
-        connection = self.get_connection()
+        connection = self.get_connection(readonly=True)
         if connection is None:
             return None
         
@@ -543,14 +1300,268 @@ class Database:
             cursor.execute("SELECT id, username, email, full_name, major, academic_year, role FROM users WHERE id = %s", (user_id,))
             return cursor.fetchone()
         except Error as e:
-            print(f"Error getting user: {e}")
+            logger.error(f"Error getting user: {e}")
             return None
         finally:
             cursor.close()
             connection.close()
     
-    def get_all_admins(self):
+    def create_certification(self, cert_data):
         connection = self.get_connection()
+        if connection is None:
+            return False, "Database connection failed"
+        
+        cursor = connection.cursor()
+        try:
+            issue_date = parse_issue_date(cert_data.get('issue_date'))
+            # The unique key on certificate_code is the real guarantee; a
+            # collision just costs another draw.
+            for attempt in range(CODE_ATTEMPTS):
+                code = new_certificate_code()
+                try:
+                    cursor.execute("""
+                        INSERT INTO certifications (certificate_code, user_id, user_name, certificate_type,
+                                                    issue_date, skills_verified, generated_by)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """, (
+                        code,
+                        cert_data.get('user_id'),
+                        cert_data['user_name'],
+                        cert_data['certificate_type'],
+                        issue_date,
+                        cert_data.get('skills_verified'),
+                        cert_data.get('generated_by')
+                    ))
+                except Error as e:
+                    if e.errno == errorcode.ER_DUP_ENTRY and attempt < CODE_ATTEMPTS - 1:
+                        continue
+                    raise
+                signed = self.signer.sign(cursor.lastrowid, cert_data['user_name'], cert_data['certificate_type'], issue_date)
+                if signed:
+                    cursor.execute("UPDATE certifications SET certificate_code = %s WHERE id = %s", (signed, cursor.lastrowid))
+                    code = signed
+                connection.commit()
+                return True, code
+        except (Error, ValueError) as e:
+            logger.error(f"Error creating certification: {e}")
+            return False, "Could not create certification"
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def issue_event_certificates(self, event_id, certificate_type, issue_date=None, generated_by=None,
+                                 batch_size=500, progress=None):
+        # One transaction for the whole event. Only registrants without a
+        # certificate for this event are issued one, so re-running after a
+        # failure or for late registrants is safe. Raises on database errors.
+        connection = self.get_connection(scoped=False)
+        if connection is None:
+            raise RuntimeError("Database connection failed")
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            issue_date = parse_issue_date(issue_date)
+            drawn = set()
+            # One more pass than inserts: the last one only checks that
+            # nobody is left without a certificate
+            for attempt in range(CODE_ATTEMPTS + 1):
+                # Accounts are matched by email so certificates also show up
+                # under the user's profile
+                cursor.execute("""
+                    SELECT er.name, er.email, u.id AS user_id
+                    FROM event_registrations er
+                    LEFT JOIN users u ON u.email = er.email
+                    LEFT JOIN certifications c ON c.event_id = er.event_id AND c.recipient_email = er.email
+                    WHERE er.event_id = %s AND c.id IS NULL
+                """, (event_id,))
+                missing = cursor.fetchall()
+                if not missing or attempt == CODE_ATTEMPTS:
+                    break
+                for start in range(0, len(missing), batch_size):
+                    chunk = missing[start:start + batch_size]
+                    # A code collision skips the row; the next pass finds it
+                    # missing and draws again
+                    codes = [new_certificate_code() for _ in chunk]
+                    drawn.update(codes)
+                    cursor.executemany("""
+                        INSERT INTO certifications (certificate_code, event_id, recipient_email, user_id, user_name,
+                                                    certificate_type, issue_date, generated_by)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE id = id
+                    """, [
+                        (code, event_id, row['email'], row['user_id'], row['name'],
+                         certificate_type, issue_date, generated_by)
+                        for code, row in zip(codes, chunk)
+                    ])
+                    if progress:
+                        progress(cursor.rowcount)
+            if missing:
+                logger.error(f"{len(missing)} registrants of event {event_id} did not get a certificate code")
+            
+            # Swap the placeholder codes of this run for signed ones, one
+            # CASE update per batch
+            cursor.execute(
+                "SELECT id, certificate_code, user_name, certificate_type, issue_date FROM certifications WHERE event_id = %s",
+                (event_id,)
+            )
+            signed = []
+            for row in cursor.fetchall():
+                if row['certificate_code'] in drawn:
+                    code = self.signer.sign(row['id'], row['user_name'], row['certificate_type'], row['issue_date'])
+                    if code:
+                        signed.append((row['id'], code))
+            for start in range(0, len(signed), batch_size):
+                chunk = signed[start:start + batch_size]
+                cases = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+                params = [value for pair in chunk for value in pair]
+                ids = [cert_id for cert_id, _ in chunk]
+                cursor.execute(
+                    f"UPDATE certifications SET certificate_code = CASE id {cases} END WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                    tuple(params + ids)
+                )
+            
+            cursor.execute("""
+                SELECT c.*, e.title AS event_title
+                FROM certifications c
+                JOIN events e ON e.id = c.event_id
+                WHERE c.event_id = %s
+                ORDER BY c.id
+            """, (event_id,))
+            certificates = cursor.fetchall()
+            connection.commit()
+            return certificates
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_certification_by_code(self, code):
+        # Public verification links are the hottest read, and most of them
+        # repeat. Malformed codes are rejected without a query; signed codes
+        # whose MAC fails still get an exact lookup, so certificates signed
+        # under a previous SECRET_KEY keep verifying.
+        code = (code or '').strip()
+        if self.signer.unsign(code) is None and not SIGNED_PATTERN.match(code):
+            code = code.upper()
+            if not LEGACY_PATTERN.match(code):
+                return None
+        
+        hit, cert, version = self.certificates.lookup('certifications', code)
+        if hit:
+            return dict(cert)
+        
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return None
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(CERTIFICATION_BY_CODE_SQL, (code,))
+            cert = cursor.fetchone()
+            # Unknown codes are not cached so guessing cannot churn the LRU
+            if cert:
+                self.certificates.store('certifications', code, cert, version)
+                return dict(cert)
+            return None
+        except Error as e:
+            logger.error(f"Error getting certification: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_certifications_by_codes(self, codes):
+        if not codes:
+            return []
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return []
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(
+                f"SELECT * FROM certifications WHERE certificate_code IN ({', '.join(['%s'] * len(codes))})",
+                tuple(codes)
+            )
+            return cursor.fetchall()
+        except Error as e:
+            logger.error(f"Error getting certifications: {e}")
+            return []
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_revoked_certification_ids(self):
+        # Returns None on failure so the caller keeps its previous list
+        connection = self.get_connection(scoped=False)
+        if connection is None:
+            return None
+        
+        cursor = connection.cursor()
+        try:
+            cursor.execute(REVOKED_CERTIFICATIONS_SQL)
+            return [row[0] for row in cursor.fetchall()]
+        except Error as e:
+            logger.error(f"Error getting revoked certifications: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def revoke_certification(self, cert_id):
+        connection = self.get_connection()
+        if connection is None:
+            return False
+        
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "UPDATE certifications SET revoked_at = CURRENT_TIMESTAMP WHERE id = %s AND revoked_at IS NULL",
+                (cert_id,)
+            )
+            connection.commit()
+            self._invalidate(connection, 'certifications')
+            return cursor.rowcount > 0
+        except Error as e:
+            logger.error(f"Error revoking certification: {e}")
+            return False
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_user_certifications(self, user_id):
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return []
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(USER_CERTIFICATIONS_SQL, (user_id,))
+            return cursor.fetchall()
+        except Error as e:
+            logger.error(f"Error getting user certifications: {e}")
+            return []
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_all_certifications(self, limit=500):
+        connection = self.get_connection(readonly=True)
+        if connection is None:
+            return []
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(ALL_CERTIFICATIONS_SQL, (limit,))
+            return cursor.fetchall()
+        except Error as e:
+            logger.error(f"Error getting certifications: {e}")
+            return []
+        finally:
+            cursor.close()
+            connection.close()
+    
+    def get_all_admins(self):
+        connection = self.get_connection(readonly=True)
         if connection is None:
             return []
         
@@ -559,7 +1570,7 @@ class Database:
             cursor.execute("SELECT id, username, email, full_name, role, is_active, created_at FROM admin_users ORDER BY created_at DESC")
             return cursor.fetchall()
         except Error as e:
-            print(f"Error getting admins: {e}")
+            logger.error(f"Error getting admins: {e}")
             return []
         finally:
             cursor.close()
@@ -572,7 +1583,7 @@ class Database:
         
         cursor = connection.cursor()
         try:
-            password_hash = hashlib.sha256(admin_data['password'].encode()).hexdigest()
+            password_hash = hasher.hash(admin_data['password'])
             cursor.execute("""
                 INSERT INTO admin_users (username, password_hash, email, full_name, role)
                 VALUES (%s, %s, %s, %s, %s)
@@ -586,7 +1597,7 @@ class Database:
             connection.commit()
             return True, "Admin user created successfully"
         except Error as e:
-            print(f"Error creating admin: {e}")
+            logger.error(f"Error creating admin: {e}")
             return False, "Username or email already exists"
         finally:
             cursor.close()
@@ -0,0 +1,34 @@
+import csv
+import io
+import json
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+REGISTRATION_COLUMNS = ['id', 'event_id', 'event_title', 'name', 'email', 'major', 'academic_year', 'registration_date']
+MEMBER_COLUMNS = ['id', 'name', 'email', 'major', 'academic_year', 'interests', 'experience_level',
+                  'message', 'newsletter_subscription', 'join_date']
+
+
+def stream_rows(batches, columns, fmt):
+    # One chunk per fetched batch keeps memory flat and lets the header go
+    # out before the query has produced its first row.
+    if fmt == 'ndjson':
+        for batch in batches:
+            yield ''.join(
+                json.dumps({column: row[column] for column in columns}, default=str) + '\n'
+                for row in batch
+            )
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([row[column] for column in columns] for row in batch)
+        yield buffer.getvalue()
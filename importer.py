@@ -0,0 +1,350 @@
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from datetime import datetime
+from mysql.connector import Error
+
+
+def _text(value, required=False, max_length=255):
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ValueError('is required')
+    if len(value) > max_length:
+        raise ValueError(f'is longer than {max_length} characters')
+    return value or None
+
+
+def _date(value, required=False):
+    value = _text(value, required)
+    if value is None:
+        return None
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _time(value, required=False):
+    value = _text(value, required)
+    if value is None:
+        return None
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            pass
+    raise ValueError(f'is not a time: {value!r}')
+
+
+def _datetime(value):
+    value = _text(value)
+    if value is None:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def _int(value, minimum=None):
+    value = int(value)
+    if minimum is not None and value < minimum:
+        raise ValueError(f'must be at least {minimum}')
+    return value
+
+
+def _bool(value, default=True):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on', 'y')
+
+
+# Per kind: target table and (column, parser) pairs in insert order.
+# Aliases let files exported from the web forms be imported as-is.
+SPECS = {
+    'events': {
+        'table': 'events',
+        'fields': [
+            ('title', lambda v: _text(v, True)),
+            ('date', lambda v: _date(v, True)),
+            ('time', lambda v: _time(v, True)),
+            ('location', lambda v: _text(v, True)),
+            ('description', lambda v: _text(v, True, 65535)),
+            ('category', lambda v: _text(v, True, 50)),
+            ('max_participants', lambda v: _int(v, 1)),
+            ('is_active', _bool),
+        ],
+    },
+    'registrations': {
+        'table': 'event_registrations',
+        'fields': [
+            ('event_id', lambda v: _int(v, 1)),
+            ('name', lambda v: _text(v, True)),
+            ('email', lambda v: _text(v, True).lower()),
+            ('major', lambda v: _text(v, max_length=100)),
+            ('academic_year', lambda v: _text(v, max_length=50)),
+            ('registration_date', lambda v: _datetime(v) or datetime.now()),
+        ],
+    },
+    'members': {
+        'table': 'club_members',
+        'fields': [
+            ('name', lambda v: _text(v, True)),
+            ('email', lambda v: _text(v, True).lower()),
+            ('major', lambda v: _text(v, max_length=100)),
+            ('academic_year', lambda v: _text(v, max_length=50)),
+            ('interests', lambda v: _text(v, max_length=65535)),
+            ('experience_level', lambda v: _text(v, max_length=50)),
+            ('message', lambda v: _text(v, max_length=65535)),
+            ('newsletter_subscription', _bool),
+            ('join_date', lambda v: _datetime(v) or datetime.now()),
+        ],
+    },
+}
+
+ALIASES = {
+    'academic_year': 'year',
+    'interests': 'interest',
+    'experience_level': 'experience',
+    'newsletter_subscription': 'newsletter',
+}
+
+
+def validate(spec, record):
+    values = []
+    for column, parse in spec['fields']:
+        value = record.get(column)
+        if value is None and column in ALIASES:
+            value = record.get(ALIASES[column])
+        try:
+            values.append(parse(value))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f'{column} {e}')
+    return tuple(values)
+
+
+def iter_csv(stream):
+    reader = csv.DictReader(stream)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def iter_json(stream, chunk_size=65536):
+    # Accepts either JSON Lines or a single top-level array; the array is
+    # decoded object by object so large files never sit in memory whole.
+    decoder = json.JSONDecoder()
+    buffer = stream.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        for number, line in enumerate(_lines(buffer, stream), 1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, f'invalid JSON: {e}'
+        return
+
+    buffer = buffer[1:]
+    number = 0
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = stream.read(chunk_size)
+            eof = not more
+            buffer += more
+            continue
+        number += 1
+        yield number, record
+        buffer = buffer[end:]
+
+
+def _lines(head, stream):
+    # head is the chunk iter_json already read; it is split like the rest
+    pending = ''
+    chunk = head
+    while chunk:
+        pending += chunk
+        lines = pending.split('\n')
+        pending = lines.pop()
+        yield from lines
+        chunk = stream.read(65536)
+    if pending:
+        yield pending
+
+
+def check_parsers():
+    # Regression checks for the streaming parsers; run with --check
+    def parse(text, chunk_size=65536):
+        return list(iter_json(io.StringIO(text), chunk_size=chunk_size))
+
+    assert parse('{"a":1}\n{"b":2}\n') == [(1, {'a': 1}), (2, {'b': 2})]
+    assert parse('{"a":1}\n\n{"b":2}') == [(1, {'a': 1}), (3, {'b': 2})]
+    (_, first), (_, second) = parse('{"a":1}\n{"b":')
+    assert first == {'a': 1} and second.startswith('invalid JSON')
+    assert parse('[{"a":1}, {"b":2}]') == [(1, {'a': 1}), (2, {'b': 2})]
+    assert parse('[{"a":1}, {"b":2}]', chunk_size=4) == [(1, {'a': 1}), (2, {'b': 2})]
+    lines = ''.join(f'{{"n":{i},"pad":"{"x" * 40}"}}\n' for i in range(3000))
+    assert [record['n'] for _, record in parse(lines)] == list(range(3000))
+
+
+def open_records(stream, fmt):
+    if fmt == 'csv':
+        return iter_csv(stream)
+    if fmt in ('json', 'jsonl', 'ndjson'):
+        return iter_json(stream)
+    raise ValueError(f'Unsupported format: {fmt}')
+
+
+class Importer:
+    def __init__(self, database, kind, chunk_size=1000, on_duplicate='skip', max_errors=1000, progress=None):
+        if kind not in SPECS:
+            raise ValueError(f'Unknown import kind: {kind}')
+        self.database = database
+        self.kind = kind
+        self.spec = SPECS[kind]
+        self.chunk_size = chunk_size
+        self.on_duplicate = on_duplicate
+        self.max_errors = max_errors
+        self.progress = progress
+        self.report = {'kind': kind, 'rows': 0, 'loaded': 0, 'duplicates': 0, 'error_count': 0, 'errors': []}
+
+    def _insert_sql(self):
+        columns = [column for column, _ in self.spec['fields']]
+        sql = f"INSERT INTO {self.spec['table']} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        if self.on_duplicate == 'update':
+            updates = ', '.join(f"{c} = VALUES({c})" for c in columns if c not in ('event_id', 'email'))
+        else:
+            updates = 'id = id'
+        return sql + f" ON DUPLICATE KEY UPDATE {updates}"
+
+    def _error(self, line, message):
+        self.report['error_count'] += 1
+        if len(self.report['errors']) < self.max_errors:
+            self.report['errors'].append({'row': line, 'error': message})
+
+    def run(self, records):
+        started = time.perf_counter()
+        connection = self.database.get_connection(scoped=False)
+        if connection is None:
+            raise RuntimeError('Database connection failed')
+        cursor = connection.cursor()
+        sql = self._insert_sql()
+        try:
+            chunk = []
+            for line, record in records:
+                self.report['rows'] += 1
+                if not isinstance(record, dict):
+                    self._error(line, record if isinstance(record, str) else 'row is not an object')
+                    continue
+                try:
+                    chunk.append((line, validate(self.spec, record)))
+                except ValueError as e:
+                    self._error(line, str(e))
+                if len(chunk) >= self.chunk_size:
+                    self._load_chunk(connection, cursor, sql, chunk)
+                    chunk = []
+                    self._report_progress(started)
+            if chunk:
+                self._load_chunk(connection, cursor, sql, chunk)
+        finally:
+            cursor.close()
+            connection.close()
+        if self.kind in ('events', 'registrations') and self.report['loaded']:
+            self.database.cache.invalidate('events', content=self.kind == 'events')
+        self._report_progress(started)
+        return self.report
+
+    def _load_chunk(self, connection, cursor, sql, chunk):
+        try:
+            cursor.executemany(sql, [values for _, values in chunk])
+            loaded = cursor.rowcount
+            self._after_chunk(cursor, chunk)
+            connection.commit()
+        except Error:
+            connection.rollback()
+            self._load_rows(connection, cursor, sql, chunk)
+        else:
+            self._count(len(chunk), loaded)
+
+    def _load_rows(self, connection, cursor, sql, chunk):
+        # Slow path after a failed batch: isolate the offending rows
+        good = []
+        for line, values in chunk:
+            try:
+                cursor.execute(sql, values)
+                self._count(1, cursor.rowcount)
+                good.append((line, values))
+            except Error as e:
+                self._error(line, e.msg)
+        self._after_chunk(cursor, good)
+        connection.commit()
+
+    def _count(self, sent, affected):
+        if self.on_duplicate == 'skip':
+            self.report['loaded'] += affected
+            self.report['duplicates'] += sent - affected
+        else:
+            self.report['loaded'] += sent
+
+    def _after_chunk(self, cursor, chunk):
+        if self.kind != 'registrations' or not chunk:
+            return
+        # Keep the seat counters the registration path relies on in step
+        event_ids = sorted({values[0] for _, values in chunk})
+        placeholders = ', '.join(['%s'] * len(event_ids))
+        cursor.execute(f"""
+            UPDATE events e
+            SET current_participants = (SELECT COUNT(*) FROM event_registrations er WHERE er.event_id = e.id)
+            WHERE e.id IN ({placeholders})
+        """, tuple(event_ids))
+
+    def _report_progress(self, started):
+        elapsed = time.perf_counter() - started
+        self.report['seconds'] = round(elapsed, 3)
+        self.report['rows_per_sec'] = round(self.report['rows'] / elapsed, 1) if elapsed else None
+        if self.progress:
+            self.progress(self.report)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk import events, registrations or club members')
+    parser.add_argument('kind', nargs='?', choices=sorted(SPECS))
+    parser.add_argument('path', nargs='?')
+    parser.add_argument('--format', choices=['csv', 'json', 'jsonl', 'ndjson'],
+                        help='defaults to the file extension')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--on-duplicate', choices=['skip', 'update'], default='skip')
+    parser.add_argument('--check', action='store_true', help='run the parser regression checks and exit')
+    args = parser.parse_args(argv)
+
+    if args.check:
+        check_parsers()
+        print("Parser checks passed")
+        return 0
+    if not args.kind or not args.path:
+        parser.error('kind and path are required')
+
+    from database import db
+
+    fmt = args.format or args.path.rsplit('.', 1)[-1].lower()
+
+    def progress(report):
+        print(f"\r{report['rows']} rows, {report['loaded']} loaded, {report['duplicates']} duplicates, "
+              f"{report['error_count']} errors, {report['rows_per_sec']} rows/sec", end='', flush=True)
+
+    importer = Importer(db, args.kind, chunk_size=args.chunk_size, on_duplicate=args.on_duplicate, progress=progress)
+    with open(args.path, newline='', encoding='utf-8-sig') as stream:
+        report = importer.run(open_records(stream, fmt))
+    print()
+    for error in report['errors']:
+        print(f"  row {error['row']}: {error['error']}")
+    return 1 if report['error_count'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import json
+import logging
+import os
+import random
+import socket
+import uuid
+from mysql.connector import Error
+
+logger = logging.getLogger(__name__)
+
+handlers = {}
+
+
+def handler(kind):
+    # Registers fn(payload) as the handler for jobs of this kind
+    def register(fn):
+        handlers[kind] = fn
+        return fn
+    return register
+
+
+class PermanentFailure(Exception):
+    # Raised by a handler when retrying cannot help
+    pass
+
+
+class JobQueue:
+    # Jobs live in the MySQL `jobs` table. A claim moves a job to 'running'
+    # and pushes its available_at out by the visibility timeout, so a job
+    # whose worker died becomes claimable again on its own. Claims use
+    # FOR UPDATE SKIP LOCKED, so workers never wait on each other's rows.
+    # Every claim gets a fresh lease token; complete/fail only apply while
+    # the caller still holds the lease.
+    def __init__(self, database, visibility_timeout=300, backoff_base=5, backoff_max=3600):
+        self.database = database
+        self.visibility_timeout = visibility_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+
+    def enqueue(self, kind, payload=None, priority=0, delay=0, max_attempts=5, queue='default'):
+        # Inside a request this uses the request's connection, so the job is
+        # committed together with the writes that caused it, or not at all.
+        connection = self.database.get_connection()
+        if connection is None:
+            return None
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO jobs (queue, kind, payload, priority, max_attempts, available_at)
+                VALUES (%s, %s, %s, %s, %s, NOW(6) + INTERVAL %s SECOND)
+            """, (queue, kind, json.dumps(payload or {}, default=str), priority, max_attempts, delay))
+            connection.commit()
+            return cursor.lastrowid
+        except Error as e:
+            logger.error(f"Error enqueueing {kind} job: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+
+    def enqueue_many(self, kind, payloads, priority=0, delay=0, max_attempts=5, queue='default'):
+        # One statement and one commit for a whole batch of jobs
+        if not payloads:
+            return 0
+        connection = self.database.get_connection()
+        if connection is None:
+            return 0
+
+        cursor = connection.cursor()
+        try:
+            cursor.executemany("""
+                INSERT INTO jobs (queue, kind, payload, priority, max_attempts, available_at)
+                VALUES (%s, %s, %s, %s, %s, NOW(6) + INTERVAL %s SECOND)
+            """, [(queue, kind, json.dumps(payload, default=str), priority, max_attempts, delay) for payload in payloads])
+            connection.commit()
+            return len(payloads)
+        except Error as e:
+            logger.error(f"Error enqueueing {len(payloads)} {kind} jobs: {e}")
+            return 0
+        finally:
+            cursor.close()
+            connection.close()
+
+    def claim(self, queues=('default',), limit=1):
+        connection = self.database.get_connection(scoped=False)
+        if connection is None:
+            return []
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(f"""
+                SELECT id FROM jobs
+                WHERE status IN ('queued', 'running') AND available_at <= NOW(6)
+                  AND queue IN ({', '.join(['%s'] * len(queues))})
+                ORDER BY priority DESC, available_at, id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            """, (*queues, limit))
+            ids = [row['id'] for row in cursor.fetchall()]
+            if not ids:
+                connection.rollback()
+                return []
+            lease = f'{self.worker_id}:{uuid.uuid4().hex[:12]}'
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(f"""
+                UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_by = %s,
+                       available_at = NOW(6) + INTERVAL %s SECOND
+                WHERE id IN ({placeholders})
+            """, (lease, self.visibility_timeout, *ids))
+            cursor.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders})", tuple(ids))
+            jobs = cursor.fetchall()
+            connection.commit()
+            for job in jobs:
+                job['payload'] = json.loads(job['payload'])
+            return jobs
+        except Error as e:
+            connection.rollback()
+            logger.error(f"Error claiming jobs: {e}")
+            return []
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _finish(self, query, params):
+        connection = self.database.get_connection(scoped=False)
+        if connection is None:
+            return False
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute(query, params)
+            connection.commit()
+            return cursor.rowcount > 0
+        except Error as e:
+            logger.error(f"Error updating job: {e}")
+            return False
+        finally:
+            cursor.close()
+            connection.close()
+
+    def extend(self, job):
+        return self._finish(
+            "UPDATE jobs SET available_at = NOW(6) + INTERVAL %s SECOND WHERE id = %s AND locked_by = %s AND status = 'running'",
+            (self.visibility_timeout, job['id'], job['locked_by'])
+        )
+
+    def complete(self, job, result=None):
+        return self._finish("""
+            UPDATE jobs SET status = 'done', finished_at = NOW(6), result = %s, last_error = NULL
+            WHERE id = %s AND locked_by = %s AND status = 'running'
+        """, (json.dumps(result, default=str), job['id'], job['locked_by']))
+
+    def fail(self, job, error, permanent=False):
+        if permanent or job['attempts'] >= job['max_attempts']:
+            return self._finish("""
+                UPDATE jobs SET status = 'failed', finished_at = NOW(6), last_error = %s
+                WHERE id = %s AND locked_by = %s AND status = 'running'
+            """, (error[:2000], job['id'], job['locked_by']))
+        # Exponential backoff with full jitter
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (job['attempts'] - 1)))
+        return self._finish("""
+            UPDATE jobs SET status = 'queued', available_at = NOW(6) + INTERVAL %s SECOND, last_error = %s
+            WHERE id = %s AND locked_by = %s AND status = 'running'
+        """, (round(delay, 3), error[:2000], job['id'], job['locked_by']))
+
+    def run(self, job):
+        # Executes one claimed job and records the outcome
+        fn = handlers.get(job['kind'])
+        if fn is None:
+            return self.fail(job, f"No handler for job kind {job['kind']}", permanent=True)
+        if job['attempts'] > job['max_attempts']:
+            # Claimed again after its lease expired once too often
+            return self.fail(job, 'Visibility timeout expired on the last attempt', permanent=True)
+        try:
+            result = fn(job['payload'])
+        except PermanentFailure as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) failed permanently: {e}")
+            return self.fail(job, str(e), permanent=True)
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {e}")
+            return self.fail(job, f'{type(e).__name__}: {e}')
+        return self.complete(job, result)
+
+    def purge(self, days):
+        # Deletes finished jobs older than `days`, in small chunks so the
+        # queue table is never locked for long
+        connection = self.database.get_connection(scoped=False)
+        if connection is None:
+            return 0
+
+        cursor = connection.cursor()
+        deleted = 0
+        try:
+            while True:
+                cursor.execute("""
+                    DELETE FROM jobs WHERE finished_at < NOW(6) - INTERVAL %s DAY
+                    LIMIT 1000
+                """, (days,))
+                connection.commit()
+                deleted += cursor.rowcount
+                if cursor.rowcount < 1000:
+                    return deleted
+        except Error as e:
+            logger.error(f"Error purging jobs: {e}")
+            return deleted
+        finally:
+            cursor.close()
+            connection.close()
+
+    def stats(self):
+        connection = self.database.get_connection()
+        if connection is None:
+            return {}
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+            stats = {status: count for status, count in cursor.fetchall()}
+            cursor.execute("""
+                SELECT COUNT(*), TIMESTAMPDIFF(SECOND, MIN(available_at), NOW(6)) FROM jobs
+                WHERE status = 'queued' AND available_at <= NOW(6)
+            """)
+            ready, oldest = cursor.fetchone()
+            stats['ready'] = ready
+            stats['oldest_ready_seconds'] = oldest or 0
+            return stats
+        except Error as e:
+            logger.error(f"Error getting job stats: {e}")
+            return {}
+        finally:
+            cursor.close()
+            connection.close()
@@ -0,0 +1,263 @@
+import contextvars
+import functools
+import inspect
+import logging
+import threading
+import time
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+current_method = contextvars.ContextVar('current_method', default='unknown')
+request_queries = contextvars.ContextVar('request_queries', default=None)
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.labels, label_values)} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_values, (counts, count, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _labels(self.labels + ('le',), label_values + (bound,))
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _labels(self.labels + ('le',), label_values + ('+Inf',))
+                lines.append(f'{self.name}_bucket{labels} {count}')
+                lines.append(f'{self.name}_sum{_labels(self.labels, label_values)} {total}')
+                lines.append(f'{self.name}_count{_labels(self.labels, label_values)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, *args, **kwargs):
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def add_gauges(self, prefix, help, collect):
+        # collect() returns a flat {name: number} dict, e.g. pool_stats()
+        self.collectors.append((prefix, help, collect))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for prefix, help, collect in self.collectors:
+            for key, value in sorted(collect().items()):
+                if isinstance(value, (int, float)):
+                    lines.append(f'# HELP {prefix}_{key} {help}')
+                    lines.append(f'# TYPE {prefix}_{key} gauge')
+                    lines.append(f'{prefix}_{key} {float(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+method_duration = registry.histogram('db_method_duration_seconds', 'Time spent in a Database method', ('method',))
+method_errors = registry.counter('db_method_errors_total', 'Exceptions raised by a Database method', ('method',))
+query_duration = registry.histogram('db_query_duration_seconds', 'Time spent executing SQL', ('method',))
+query_errors = registry.counter('db_query_errors_total', 'SQL statements that raised', ('method',))
+queries = registry.counter('db_queries_total', 'SQL statements executed', ('method',))
+rows_returned = registry.counter('db_rows_returned_total', 'Rows fetched from MySQL', ('method',))
+acquire_duration = registry.histogram('db_pool_acquire_seconds', 'Time to check a connection out of the pool')
+queries_per_request = registry.histogram('db_queries_per_request', 'SQL statements per HTTP request',
+                                         ('endpoint',), buckets=COUNT_BUCKETS)
+
+slow_query_threshold = 0.2
+
+
+def instrument_methods(exclude=()):
+    # Class decorator: wraps every public method so its latency and errors are
+    # recorded and the SQL it runs is attributed to it.
+    def decorate(cls):
+        for name, attr in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not callable(attr):
+                continue
+            setattr(cls, name, _instrumented(name, attr))
+        return cls
+    return decorate
+
+
+def _instrumented(name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = current_method.set(name)
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            method_errors.inc(name)
+            method_duration.observe(time.perf_counter() - started, name)
+            raise
+        finally:
+            current_method.reset(token)
+        elapsed = time.perf_counter() - started
+        if inspect.isgenerator(result):
+            # Streaming readers run their SQL as the rows are consumed
+            return _instrumented_iter(name, result, elapsed)
+        method_duration.observe(elapsed, name)
+        return result
+    return wrapper
+
+
+def _instrumented_iter(name, generator, elapsed):
+    # Times only the steps that produce rows, not the consumer's work between
+    # them, and attributes the SQL of each step to the method
+    try:
+        while True:
+            token = current_method.set(name)
+            started = time.perf_counter()
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            except Exception:
+                method_errors.inc(name)
+                raise
+            finally:
+                elapsed += time.perf_counter() - started
+                current_method.reset(token)
+            yield item
+    finally:
+        generator.close()
+        method_duration.observe(elapsed, name)
+
+
+def _shape(params):
+    if params is None:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{k}: {type(v).__name__}' for k, v in params.items()) + '}'
+    return '(' + ', '.join(type(p).__name__ for p in params) + ')'
+
+
+class InstrumentedCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            rows_returned.inc(current_method.get())
+            yield row
+
+    def _timed(self, fn, operation, params, *args, many=False, **kwargs):
+        method = current_method.get()
+        counter = request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+        queries.inc(method)
+        started = time.perf_counter()
+        try:
+            return fn(operation, params, *args, **kwargs)
+        except Exception:
+            query_errors.inc(method)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            query_duration.observe(elapsed, method)
+            if elapsed >= slow_query_threshold:
+                shape = _shape(params[0] if many and params else params)
+                logger.warning("Slow query in %s took %.1f ms: %s params=%s", method, elapsed * 1000,
+                               ' '.join(str(operation).split()), shape)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, seq_params, *args, many=True, **kwargs)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            rows_returned.inc(current_method.get())
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        rows_returned.inc(current_method.get(), amount=len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        rows_returned.inc(current_method.get(), amount=len(rows))
+        return rows
+
+
+def init_app(app, threshold_ms=200):
+    global slow_query_threshold
+    slow_query_threshold = threshold_ms / 1000
+
+    @app.before_request
+    def count_queries():
+        request_queries.set([0])
+
+    @app.teardown_request
+    def record_query_count(exc=None):
+        counter = request_queries.get()
+        if counter is not None:
+            queries_per_request.observe(counter[0], request.endpoint or 'unknown')
+            request_queries.set(None)
@@ -0,0 +1,322 @@
+import argparse
+import sys
+from mysql.connector import Error
+
+
+class AddIndex:
+    def __init__(self, table, name, columns, unique=False):
+        self.table = table
+        self.name = name
+        self.columns = columns
+        self.unique = unique
+
+    def is_applied(self, cursor):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (self.table, self.name))
+        return cursor.fetchone()[0] > 0
+
+    def sql(self):
+        kind = 'UNIQUE INDEX' if self.unique else 'INDEX'
+        return f"CREATE {kind} {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+
+class AddColumn:
+    def __init__(self, table, name, definition):
+        self.table = table
+        self.name = name
+        self.definition = definition
+
+    def is_applied(self, cursor):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """, (self.table, self.name))
+        return cursor.fetchone()[0] > 0
+
+    def sql(self):
+        return f"ALTER TABLE {self.table} ADD COLUMN {self.name} {self.definition}"
+
+
+class CreateTable:
+    def __init__(self, table, definition):
+        self.table = table
+        self.definition = definition
+
+    def is_applied(self, cursor):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = %s
+        """, (self.table,))
+        return cursor.fetchone()[0] > 0
+
+    def sql(self):
+        return f"CREATE TABLE {self.table} ({self.definition})"
+
+
+class ModifyColumn:
+    def __init__(self, table, name, definition, column_type, collation=None):
+        self.table = table
+        self.name = name
+        self.definition = definition
+        self.column_type = column_type
+        self.collation = collation
+
+    def is_applied(self, cursor):
+        cursor.execute("""
+            SELECT column_type, collation_name FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """, (self.table, self.name))
+        row = cursor.fetchone()
+        return row is not None and row[0] == self.column_type and (self.collation is None or row[1] == self.collation)
+
+    def sql(self):
+        return f"ALTER TABLE {self.table} MODIFY COLUMN {self.name} {self.definition}"
+
+
+class RunSQL:
+    # Data changes; `applied_when` is a COUNT query that is non-zero once done
+    def __init__(self, statement, applied_when=None):
+        self.statement = statement
+        self.applied_when = applied_when
+
+    def is_applied(self, cursor):
+        if self.applied_when is None:
+            return False
+        cursor.execute(self.applied_when)
+        return cursor.fetchone()[0] > 0
+
+    def sql(self):
+        return self.statement
+
+
+# Ordered and append-only: never edit a migration that may have shipped.
+# Each index is matched to a query in database.py (see hot_queries below).
+MIGRATIONS = [
+    (1, 'Index active events by date for listings and keyset paging', [
+        AddIndex('events', 'idx_events_active_date', ['is_active', 'date', 'time', 'id']),
+        AddIndex('events', 'idx_events_active_category_date', ['is_active', 'category', 'date', 'time', 'id']),
+    ]),
+    (2, 'Index active projects by category and creation time', [
+        AddIndex('projects', 'idx_projects_active_created', ['is_active', 'created_at']),
+        AddIndex('projects', 'idx_projects_category_active_created', ['category', 'is_active', 'created_at']),
+        AddIndex('projects', 'idx_projects_active_category', ['is_active', 'category']),
+    ]),
+    (3, 'Index registrations by date, globally and per event', [
+        AddIndex('event_registrations', 'idx_registrations_date', ['registration_date']),
+        AddIndex('event_registrations', 'idx_registrations_event_date', ['event_id', 'registration_date']),
+    ]),
+    (4, 'Create certifications with a unique verification code', [
+        CreateTable('certifications', """
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            certificate_code VARCHAR(32) NOT NULL,
+            user_id INT NULL,
+            user_name VARCHAR(255) NOT NULL,
+            certificate_type VARCHAR(100) NOT NULL,
+            issue_date DATE NOT NULL,
+            skills_verified TEXT,
+            generated_by INT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_certifications_code (certificate_code),
+            KEY idx_certifications_user_issued (user_id, issue_date, id),
+            KEY idx_certifications_issued (issue_date, id),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+        """),
+    ]),
+    (5, 'Link certifications to event registrants, one per event and email', [
+        AddColumn('certifications', 'event_id', 'INT NULL'),
+        AddColumn('certifications', 'recipient_email', 'VARCHAR(255) NULL'),
+        AddIndex('certifications', 'uq_certifications_event_email', ['event_id', 'recipient_email'], unique=True),
+    ]),
+    (6, 'Make room for signed certificate codes and track revocations', [
+        ModifyColumn('certifications', 'certificate_code',
+                     'VARCHAR(255) CHARACTER SET ascii COLLATE ascii_bin NOT NULL',
+                     'varchar(255)', collation='ascii_bin'),
+        AddColumn('certifications', 'revoked_at', 'TIMESTAMP NULL'),
+        AddIndex('certifications', 'idx_certifications_revoked', ['revoked_at']),
+    ]),
+    (7, 'Normalize project technologies into an indexed tag table', [
+        CreateTable('project_technologies', """
+            project_id INT NOT NULL,
+            position SMALLINT NOT NULL,
+            tag VARCHAR(100) NOT NULL,
+            PRIMARY KEY (project_id, position),
+            UNIQUE KEY uq_project_technologies_tag (project_id, tag),
+            KEY idx_project_technologies_tag (tag, project_id),
+            FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+        """),
+        RunSQL("""
+            INSERT IGNORE INTO project_technologies (project_id, position, tag)
+            SELECT p.id, jt.position, jt.tag
+            FROM projects p,
+                 JSON_TABLE(p.technologies, '$[*]' COLUMNS (
+                     position FOR ORDINALITY,
+                     tag VARCHAR(100) PATH '$'
+                 )) jt
+            WHERE p.technologies IS NOT NULL AND jt.tag IS NOT NULL
+        """, applied_when="SELECT COUNT(*) FROM project_technologies"),
+    ]),
+    (8, 'Track newsletter campaigns and page through subscribers by id', [
+        CreateTable('newsletter_campaigns', """
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            subject VARCHAR(255) NOT NULL,
+            body TEXT NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'draft',
+            last_member_id INT NOT NULL DEFAULT 0,
+            sent INT NOT NULL DEFAULT 0,
+            failed INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP
+        """),
+        AddIndex('club_members', 'idx_members_newsletter', ['newsletter_subscription', 'id']),
+    ]),
+    (9, 'Create the background job queue', [
+        CreateTable('jobs', """
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            queue VARCHAR(50) NOT NULL DEFAULT 'default',
+            kind VARCHAR(100) NOT NULL,
+            payload JSON NOT NULL,
+            priority INT NOT NULL DEFAULT 0,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            attempts INT NOT NULL DEFAULT 0,
+            max_attempts INT NOT NULL DEFAULT 5,
+            available_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            locked_by VARCHAR(100) NULL,
+            last_error TEXT NULL,
+            result JSON NULL,
+            created_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            finished_at DATETIME(6) NULL,
+            KEY idx_jobs_ready (status, available_at),
+            KEY idx_jobs_finished (finished_at)
+        """),
+    ]),
+]
+
+def hot_queries():
+    # (name, SQL, params) for the queries that serve public pages, logins and
+    # exports, built by the same code database.py runs them with.
+    from database import (
+        ADMIN_LOGIN_SQL, ALL_CERTIFICATIONS_SQL, CERTIFICATION_BY_CODE_SQL, EVENT_CATEGORIES_SQL,
+        NEWSLETTER_RECIPIENTS_SQL, PROJECT_CATEGORIES_SQL, REVOKED_CERTIFICATIONS_SQL, USER_CERTIFICATIONS_SQL,
+        USER_LOGIN_SQL, events_page_query, project_technologies_query, projects_query, registrations_query,
+    )
+    after = ('2024-01-01', '12:00:00', 1)
+    return [
+        ('events.active', *events_page_query()),
+        ('events.active_next', *events_page_query(after=after)),
+        ('events.active_category', *events_page_query('Workshop')),
+        ('events.active_category_next', *events_page_query('Workshop', after=after)),
+        ('events.categories', EVENT_CATEGORIES_SQL, ()),
+        ('projects.active', *projects_query()),
+        ('projects.category', *projects_query('Web')),
+        ('projects.tech', *projects_query(tech='Flask')),
+        ('projects.category_tech', *projects_query('Web', 'Flask')),
+        ('projects.categories', PROJECT_CATEGORIES_SQL, ()),
+        ('projects.technologies', *project_technologies_query([1, 2])),
+        ('registrations.all', *registrations_query()),
+        ('registrations.event', *registrations_query(1)),
+        ('registrations.export_since', *registrations_query(since='2024-01-01')),
+        ('registrations.export_event_range', *registrations_query(1, '2024-01-01', '2024-02-01')),
+        ('certifications.code', CERTIFICATION_BY_CODE_SQL, ('GMU-0000-0000',)),
+        ('certifications.revoked', REVOKED_CERTIFICATIONS_SQL, ()),
+        ('certifications.user', USER_CERTIFICATIONS_SQL, (1,)),
+        ('certifications.all', ALL_CERTIFICATIONS_SQL, (500,)),
+        ('members.newsletter', NEWSLETTER_RECIPIENTS_SQL, (0, 500)),
+        ('users.login', USER_LOGIN_SQL, ('john_doe',)),
+        ('admin_users.login', ADMIN_LOGIN_SQL, ('admin',)),
+    ]
+
+
+def applied_versions(cursor):
+    try:
+        cursor.execute("SELECT version FROM schema_version")
+    except Error as e:
+        if e.errno == 1146:
+            return set()
+        raise
+    return {row[0] for row in cursor.fetchall()}
+
+
+def run_migrations(connection, dry_run=False):
+    cursor = connection.cursor()
+    try:
+        if not dry_run:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+        applied = applied_versions(cursor)
+        pending = [m for m in MIGRATIONS if m[0] not in applied]
+        for version, description, steps in pending:
+            print(f"{'[dry-run] ' if dry_run else ''}Migration {version}: {description}")
+            for step in steps:
+                # Steps check the live schema so a half-applied migration can re-run
+                if step.is_applied(cursor):
+                    continue
+                print(f"    {step.sql()}")
+                if not dry_run:
+                    cursor.execute(step.sql())
+            if not dry_run:
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                connection.commit()
+        return len(pending)
+    finally:
+        cursor.close()
+
+
+def check_query_plans(connection):
+    problems = []
+    cursor = connection.cursor(dictionary=True)
+    try:
+        # Tiny dev tables make full scans look cheap; make the optimizer cost
+        # plans as if the tables were large so the check is stable.
+        cursor.execute("SET SESSION max_seeks_for_key = 1")
+        for name, sql, params in hot_queries():
+            cursor.execute("EXPLAIN " + sql, params)
+            for row in cursor.fetchall():
+                extra = row.get('Extra') or ''
+                if row.get('type') == 'ALL' or not row.get('key'):
+                    problems.append(f"{name}: full scan of {row.get('table')}")
+                if 'Using filesort' in extra:
+                    problems.append(f"{name}: filesort on {row.get('table')}")
+    finally:
+        cursor.execute("SET SESSION max_seeks_for_key = DEFAULT")
+        cursor.close()
+    return problems
+
+
+def main(argv=None):
+    from database import db
+
+    parser = argparse.ArgumentParser(description='Apply schema migrations')
+    parser.add_argument('--dry-run', action='store_true', help='print pending migrations without applying them')
+    parser.add_argument('--check', action='store_true', help='fail if a hot query is not served by an index')
+    args = parser.parse_args(argv)
+
+    connection = db.get_connection()
+    if connection is None:
+        return 1
+    try:
+        count = run_migrations(connection, dry_run=args.dry_run)
+        print(f"{count} migration(s) {'pending' if args.dry_run else 'applied'}")
+        if args.check:
+            problems = check_query_plans(connection)
+            for problem in problems:
+                print(f"❌ {problem}")
+            if problems:
+                return 1
+            print("✅ All hot queries use an index")
+        return 0
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,244 @@
+import argparse
+import logging
+import queue
+import smtplib
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from jinja2 import Environment, StrictUndefined
+from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+sent_total = metrics.registry.counter('newsletter_sent_total', 'Newsletter messages delivered')
+failed_total = metrics.registry.counter('newsletter_failed_total', 'Newsletter messages that could not be delivered')
+batch_duration = metrics.registry.histogram('newsletter_batch_seconds', 'Time to deliver one batch of newsletter messages')
+
+_templates = Environment(undefined=StrictUndefined, autoescape=False)
+
+
+class SMTPPool:
+    # Reusable SMTP sessions. A session is dropped and reopened once it has
+    # sent max_messages or when the server closes it, so a long campaign
+    # does not pay a TCP/TLS handshake per message.
+    def __init__(self, host, port, size=4, username=None, password=None, use_tls=False,
+                 timeout=30, max_messages=100):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.username:
+            server.login(self.username, self.password)
+        return [server, 0]
+
+    def send(self, message):
+        with self._slots:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                entry = self._connect()
+            try:
+                try:
+                    entry[0].send_message(message)
+                except smtplib.SMTPServerDisconnected:
+                    entry = self._connect()
+                    entry[0].send_message(message)
+            except Exception:
+                self._quit(entry)
+                raise
+            entry[1] += 1
+            if entry[1] >= self.max_messages:
+                self._quit(entry)
+            else:
+                self._idle.put(entry)
+
+    def _quit(self, entry):
+        try:
+            entry[0].quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+    def close(self):
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+class RateLimiter:
+    # Token bucket shared by the sending threads
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class NewsletterSender:
+    # Sends a campaign to subscribed club members in id order, one batch at
+    # a time. Progress (last member id, sent, failed) is saved after every
+    # batch, so an interrupted campaign resumes where it stopped; at worst
+    # the batch in flight is delivered twice.
+    def __init__(self, database, smtp, sender, concurrency=4, rate=10, batch_size=200, progress=None):
+        self.database = database
+        self.smtp = smtp
+        self.sender = sender
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate)
+        self.batch_size = batch_size
+        self.progress = progress
+
+    def _message(self, campaign, subject, body, member):
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = member['email']
+        message['Subject'] = subject.render(member=member, campaign=campaign)
+        message.set_content(body.render(member=member, campaign=campaign))
+        return message
+
+    def _deliver(self, campaign, subject, body, member):
+        self.limiter.acquire()
+        try:
+            self.smtp.send(self._message(campaign, subject, body, member))
+            return True
+        except Exception as e:
+            logger.error(f"Newsletter {campaign['id']} to {member['email']} failed: {e}")
+            return False
+
+    def run(self, campaign_id):
+        campaign = self.database.get_campaign(campaign_id)
+        if campaign is None:
+            raise ValueError(f"No newsletter campaign {campaign_id}")
+        if campaign['status'] == 'sent':
+            return campaign
+        subject = _templates.from_string(campaign['subject'])
+        body = _templates.from_string(campaign['body'])
+
+        last_id, sent, failed = campaign['last_member_id'], campaign['sent'], campaign['failed']
+        self.database.save_campaign_progress(campaign_id, last_id, sent, failed, 'sending')
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix='newsletter') as pool:
+            while True:
+                members = self.database.get_newsletter_recipients(after_id=last_id, limit=self.batch_size)
+                if not members:
+                    break
+                started = time.perf_counter()
+                results = list(pool.map(lambda member: self._deliver(campaign, subject, body, member), members))
+                elapsed = time.perf_counter() - started
+
+                delivered = sum(results)
+                sent += delivered
+                failed += len(results) - delivered
+                last_id = members[-1]['id']
+                sent_total.inc(amount=delivered)
+                failed_total.inc(amount=len(results) - delivered)
+                batch_duration.observe(elapsed)
+                if not self.database.save_campaign_progress(campaign_id, last_id, sent, failed, 'sending'):
+                    raise RuntimeError(f"Could not save progress of newsletter {campaign_id}")
+                if self.progress:
+                    self.progress({
+                        'campaign': campaign_id,
+                        'batch': len(members),
+                        'sent': sent,
+                        'failed': failed,
+                        'last_member_id': last_id,
+                        'messages_per_sec': round(len(members) / elapsed, 1) if elapsed else None,
+                    })
+        self.database.save_campaign_progress(campaign_id, last_id, sent, failed, 'sent')
+        return self.database.get_campaign(campaign_id)
+
+
+def sender_from_config(database, progress=None):
+    smtp = SMTPPool(
+        Config.SMTP_HOST,
+        Config.SMTP_PORT,
+        size=Config.NEWSLETTER_CONCURRENCY,
+        username=Config.SMTP_USERNAME,
+        password=Config.SMTP_PASSWORD,
+        use_tls=Config.SMTP_USE_TLS
+    )
+    return NewsletterSender(
+        database,
+        smtp,
+        Config.NEWSLETTER_FROM,
+        concurrency=Config.NEWSLETTER_CONCURRENCY,
+        rate=Config.NEWSLETTER_RATE_PER_SEC,
+        batch_size=Config.NEWSLETTER_BATCH_SIZE,
+        progress=progress
+    )
+
+
+def main(argv=None):
+    from database import db
+
+    parser = argparse.ArgumentParser(description='Create and send club newsletters')
+    commands = parser.add_subparsers(dest='command', required=True)
+    create = commands.add_parser('create', help='create a campaign from a Jinja template file')
+    create.add_argument('--subject', required=True)
+    create.add_argument('body', help='template file; {{ member.name }} and {{ member.email }} are available')
+    send = commands.add_parser('send', help='send or resume a campaign')
+    send.add_argument('campaign_id', type=int)
+    status = commands.add_parser('status')
+    status.add_argument('campaign_id', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'create':
+        with open(args.body, encoding='utf-8') as f:
+            campaign_id = db.create_campaign(args.subject, f.read())
+        if campaign_id is None:
+            return 1
+        print(f"Created campaign {campaign_id}")
+        return 0
+
+    if args.command == 'status':
+        campaign = db.get_campaign(args.campaign_id)
+        if campaign is None:
+            print(f"No campaign {args.campaign_id}")
+            return 1
+        print(f"{campaign['status']}: {campaign['sent']} sent, {campaign['failed']} failed, "
+              f"last member id {campaign['last_member_id']}")
+        return 0
+
+    def progress(batch):
+        print(f"{batch['batch']} messages at {batch['messages_per_sec']}/sec - "
+              f"{batch['sent']} sent, {batch['failed']} failed so far")
+
+    sender = sender_from_config(db, progress)
+    try:
+        campaign = sender.run(args.campaign_id)
+    finally:
+        sender.smtp.close()
+    print(f"Campaign {campaign['id']} {campaign['status']}: {campaign['sent']} sent, {campaign['failed']} failed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import functools
+import gzip
+import threading
+from collections import OrderedDict
+from flask import make_response, request
+from conditional import is_personal
+
+
+class PageCache:
+    # Rendered HTML for anonymous visitors, keyed by path, the query args the
+    # view reads (query_args, so made-up args cannot fill the cache with
+    # copies of a page) and the data versions the page is built from, so a
+    # write anywhere makes the old renders unreachable and they age out of
+    # the LRU. Bounded by stored bytes; with compress=True bodies are kept
+    # gzipped and sent as-is to clients that accept gzip. fill_allowed()
+    # returning False sends the render without storing it.
+    def __init__(self, versions, max_bytes=16 * 1024 * 1024, compress=True, enabled=True, fill_allowed=None):
+        self.versions = versions
+        self.fill_allowed = fill_allowed
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'skipped': 0,
+        }
+
+    def _key(self, namespaces, query_args):
+        args = tuple(request.args.get(name) for name in query_args)
+        versions = tuple(self.versions.get(ns) for ns in namespaces)
+        return (request.path, args, 'anonymous', versions)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def _put(self, key, body, mimetype):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = (body, mimetype)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats['evictions'] += 1
+
+    def _respond(self, body, mimetype):
+        if not self.compress:
+            return make_response(body, 200, {'Content-Type': mimetype})
+        if 'gzip' not in request.accept_encodings:
+            return make_response(gzip.decompress(body), 200, {'Content-Type': mimetype})
+        response = make_response(body, 200, {'Content-Type': mimetype, 'Content-Encoding': 'gzip'})
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def __call__(self, *namespaces, query_args=()):
+        def decorate(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET' or is_personal():
+                    with self._lock:
+                        self._stats['skipped'] += 1
+                    return view(*args, **kwargs)
+                # Versions are read before rendering, so a write that lands
+                # mid-render only costs a re-render on the next hit.
+                key = self._key(namespaces, query_args)
+                entry = self._get(key)
+                if entry is not None:
+                    return self._respond(*entry)
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough or is_personal():
+                    return response
+                if self.fill_allowed is not None and not self.fill_allowed():
+                    with self._lock:
+                        self._stats['skipped'] += 1
+                    return response
+                body = response.get_data()
+                if self.compress:
+                    body = gzip.compress(body, compresslevel=6)
+                self._put(key, body, response.content_type)
+                return self._respond(body, response.content_type)
+            return wrapper
+        return decorate
@@ -0,0 +1,181 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from config import Config
+
+
+# Number of cost parameters stored for each scheme
+PARAM_COUNTS = {'scrypt': 3, 'pbkdf2_sha256': 1}
+
+
+class HashingOverloaded(Exception):
+    pass
+
+
+def _b64(data):
+    return base64.b64encode(data).decode().rstrip('=')
+
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+class PasswordHasher:
+    # Hashes are "scheme$params...$salt$hash". Work runs on a small thread pool
+    # (hashlib releases the GIL) behind a fixed number of slots, so a login
+    # burst queues briefly and then fails fast instead of pinning every worker.
+    def __init__(self, scheme='scrypt', scrypt_n=2 ** 14, scrypt_r=8, scrypt_p=1,
+                 pbkdf2_iterations=600000, workers=4, queue_limit=32, timeout=5):
+        self.scheme = scheme
+        self.scrypt_n = scrypt_n
+        self.scrypt_r = scrypt_r
+        self.scrypt_p = scrypt_p
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded('Too many password checks in progress')
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            raise HashingOverloaded('Password check timed out')
+
+    def _derive(self, scheme, params, password, salt):
+        if scheme == 'scrypt':
+            n, r, p = params
+            return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+        if scheme == 'pbkdf2_sha256':
+            (iterations,) = params
+            return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+        raise ValueError(f'Unknown password scheme: {scheme}')
+
+    def _params(self):
+        if self.scheme == 'scrypt':
+            return (self.scrypt_n, self.scrypt_r, self.scrypt_p)
+        return (self.pbkdf2_iterations,)
+
+    def _encode(self, password):
+        salt = os.urandom(16)
+        params = self._params()
+        derived = self._derive(self.scheme, params, password, salt)
+        return '$'.join([self.scheme, *map(str, params), _b64(salt), _b64(derived)])
+
+    def _check(self, password, stored):
+        if '$' not in stored:
+            # Legacy unsalted SHA-256 hex digest
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, stored), True
+        scheme, *fields = stored.split('$')
+        try:
+            params = tuple(int(field) for field in fields[:-2])
+            salt, expected = _unb64(fields[-2]), _unb64(fields[-1])
+        except (IndexError, ValueError):
+            # A stored hash we cannot parse never matches
+            return False, False
+        if len(params) != PARAM_COUNTS.get(scheme):
+            return False, False
+        # Errors from here on (e.g. scrypt refusing N/r/p under its memory
+        # limit) are configuration problems and are raised, not a non-match
+        derived = self._derive(scheme, params, password, salt)
+        needs_rehash = scheme != self.scheme or params != self._params()
+        return hmac.compare_digest(derived, expected), needs_rehash
+
+    def hash(self, password):
+        return self._run(self._encode, password)
+
+    def verify(self, password, stored):
+        # Returns (matches, needs_rehash); callers should store hash(password)
+        # when both are true to move the account to the current settings.
+        if not stored:
+            return False, False
+        return self._run(self._check, password, stored)
+
+
+hasher = PasswordHasher(
+    scheme=Config.PASSWORD_HASH_SCHEME,
+    scrypt_n=Config.PASSWORD_SCRYPT_N,
+    scrypt_r=Config.PASSWORD_SCRYPT_R,
+    scrypt_p=Config.PASSWORD_SCRYPT_P,
+    pbkdf2_iterations=Config.PASSWORD_PBKDF2_ITERATIONS,
+    workers=Config.PASSWORD_HASH_WORKERS,
+    queue_limit=Config.PASSWORD_HASH_QUEUE_LIMIT,
+    timeout=Config.PASSWORD_HASH_TIMEOUT
+)
+
+
+def benchmark(settings, logins=200, concurrency=16):
+    # Simulates a login burst: `concurrency` threads verify against one stored
+    # hash per setting, going through the same bounded executor as the app.
+    results = []
+    for label, options in settings:
+        bench_hasher = PasswordHasher(workers=Config.PASSWORD_HASH_WORKERS, queue_limit=concurrency,
+                                      timeout=60, **options)
+        stored = bench_hasher.hash('correct horse battery staple')
+        latencies = []
+        rejected = []
+
+        def login():
+            started = time.perf_counter()
+            try:
+                bench_hasher.verify('correct horse battery staple', stored)
+            except HashingOverloaded:
+                rejected.append(started)
+                return
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as clients:
+            for _ in range(logins):
+                clients.submit(login)
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else None
+        results.append((label, len(latencies) / elapsed, p99, len(rejected)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark password hashing cost settings')
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args(argv)
+
+    settings = [
+        ('scrypt n=2^13', {'scheme': 'scrypt', 'scrypt_n': 2 ** 13}),
+        ('scrypt n=2^14', {'scheme': 'scrypt', 'scrypt_n': 2 ** 14}),
+        ('scrypt n=2^15', {'scheme': 'scrypt', 'scrypt_n': 2 ** 15}),
+        ('pbkdf2 200k', {'scheme': 'pbkdf2_sha256', 'pbkdf2_iterations': 200000}),
+        ('pbkdf2 600k', {'scheme': 'pbkdf2_sha256', 'pbkdf2_iterations': 600000}),
+    ]
+    print(f"{'setting':<16}{'logins/sec':>12}{'p99 ms':>10}{'rejected':>10}")
+    for label, rate, p99, rejected in benchmark(settings, args.logins, args.concurrency):
+        print(f"{label:<16}{rate:>12.1f}{(p99 or 0) * 1000:>10.1f}{rejected:>10}")
+
+
+if __name__ == '__main__':
+    main()
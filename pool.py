@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PooledConnection:
+    # Thin proxy handed out by ConnectionPool; close() returns the underlying
+    # connection to the pool instead of tearing down the socket.
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        if self._pool.cursor_wrapper is not None:
+            cursor = self._pool.cursor_wrapper(cursor)
+        return cursor
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self)
+
+
+class ConnectionPool:
+    def __init__(self, factory, size=5, max_overflow=10, max_lifetime=1800,
+                 pre_ping=True, timeout=10, cursor_wrapper=None):
+        self.factory = factory
+        self.cursor_wrapper = cursor_wrapper
+        self.size = size
+        self.max_overflow = max_overflow
+        self.max_lifetime = max_lifetime
+        self.pre_ping = pre_ping
+        self.timeout = timeout
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Condition(threading.Lock())
+        self._idle = deque()
+        self._open = 0
+        self._in_use = 0
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'created': 0,
+            'closed': 0,
+            'recycled': 0,
+            'ping_failures': 0,
+            'connect_errors': 0,
+            'forks': 0,
+        }
+
+    def _check_fork(self):
+        # Connections inherited from the parent share its sockets; drop them
+        # without closing so the parent's sessions stay intact.
+        if self._pid != os.getpid():
+            forks = self._stats['forks'] + 1
+            self._reset()
+            self._stats['forks'] = forks
+
+    def acquire(self):
+        self._check_fork()
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self._lock:
+            while True:
+                if self._idle:
+                    raw, created_at = self._idle.popleft()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    raw = None
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"Timed out after {self.timeout}s waiting for a connection "
+                        f"({self._open} open, {self._in_use} in use)"
+                    )
+                if not waited:
+                    waited = True
+                    self._stats['waits'] += 1
+                    wait_started = time.monotonic()
+                self._lock.wait(remaining)
+            if waited:
+                self._stats['wait_time'] += time.monotonic() - wait_started
+            self._stats['checkouts'] += 1
+            self._in_use += 1
+
+        try:
+            if raw is not None:
+                raw, created_at = self._validate(raw, created_at)
+            if raw is None:
+                raw = self.factory()
+                created_at = time.monotonic()
+                with self._lock:
+                    self._stats['created'] += 1
+        except Exception:
+            with self._lock:
+                self._open -= 1
+                self._in_use -= 1
+                self._stats['connect_errors'] += 1
+                self._lock.notify()
+            raise
+        return PooledConnection(self, raw, created_at)
+
+    def _validate(self, raw, created_at):
+        if self.max_lifetime and time.monotonic() - created_at > self.max_lifetime:
+            self._discard(raw)
+            with self._lock:
+                self._stats['recycled'] += 1
+            return None, None
+        if self.pre_ping:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                self._discard(raw)
+                with self._lock:
+                    self._stats['ping_failures'] += 1
+                return None, None
+        return raw, created_at
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._stats['closed'] += 1
+
+    def release(self, pooled):
+        raw = pooled._raw
+        if self._pid != os.getpid():
+            return
+        healthy = True
+        try:
+            # Never hand an open transaction to the next borrower.
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            healthy = False
+        with self._lock:
+            self._in_use -= 1
+            if healthy and len(self._idle) < self.size:
+                self._idle.append((raw, pooled._created_at))
+                self._lock.notify()
+                return
+            self._open -= 1
+            self._lock.notify()
+        self._discard(raw)
+
+    def dispose(self):
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        self._check_fork()
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+            })
+        return stats
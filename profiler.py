@@ -0,0 +1,128 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from flask import g, request, session
+
+
+def _label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    # Statistical profiler for selected requests. One background thread
+    # samples the stacks of the request threads currently being profiled and
+    # aggregates them per route as collapsed stacks ("a;b;c count"), the
+    # input format of flamegraph.pl and speedscope.
+    def __init__(self, interval=0.005, sample_rate=0, max_stacks=5000, max_depth=128):
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._active = {}
+        self._stacks = {}
+        self._requests = Counter()
+        self._pid = None
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def _wants_profile(self):
+        if request.headers.get('X-Profile') and session.get('admin_logged_in'):
+            return True
+        return self.sample_rate > 0 and random.randrange(self.sample_rate) == 0
+
+    def _before_request(self):
+        if not self._wants_profile():
+            return
+        self._start()
+        g._profiled_thread = threading.get_ident()
+        with self._lock:
+            self._active[g._profiled_thread] = request.url_rule.rule if request.url_rule else request.path
+
+    def _teardown_request(self, exc=None):
+        thread_id = g.pop('_profiled_thread', None)
+        if thread_id is None:
+            return
+        with self._lock:
+            route = self._active.pop(thread_id, None)
+            if route is not None:
+                self._requests[route] += 1
+
+    def _start(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._active = {}
+        threading.Thread(target=self._run, name='request-profiler', daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                active = dict(self._active)
+            frames = sys._current_frames()
+            samples = []
+            for thread_id, route in active.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_label(frame.f_code))
+                    frame = frame.f_back
+                samples.append((route, ';'.join(reversed(stack))))
+            with self._lock:
+                for route, stack in samples:
+                    stacks = self._stacks.setdefault(route, Counter())
+                    if stack not in stacks and len(stacks) >= self.max_stacks:
+                        stack = '[other]'
+                    stacks[stack] += 1
+
+    def routes(self):
+        with self._lock:
+            return {
+                route: {'requests': self._requests[route], 'samples': sum(stacks.values())}
+                for route, stacks in self._stacks.items()
+            }
+
+    def collapsed(self, route=None):
+        with self._lock:
+            merged = Counter()
+            for name, stacks in self._stacks.items():
+                if route is None or name == route:
+                    merged.update(stacks)
+        return '\n'.join(f"{stack} {count}" for stack, count in merged.most_common()) + '\n'
+
+    def top(self, route=None, n=20):
+        # Self samples (function on top of the stack) and total samples
+        # (function anywhere on the stack), hottest first.
+        own = Counter()
+        total = Counter()
+        with self._lock:
+            for name, stacks in self._stacks.items():
+                if route is not None and name != route:
+                    continue
+                for stack, count in stacks.items():
+                    frames = stack.split(';')
+                    own[frames[-1]] += count
+                    for frame in set(frames):
+                        total[frame] += count
+        return [
+            {'function': function, 'self': count, 'total': total[function]}
+            for function, count in own.most_common(n)
+        ]
+
+    def reset(self):
+        with self._lock:
+            self._stacks = {}
+            self._requests = Counter()
@@ -0,0 +1,138 @@
+import argparse
+import secrets
+import sys
+import threading
+import time
+
+
+def run_check(database, registrations=500, capacity=50, concurrency=100):
+    # Fires `registrations` signups at one scratch event with `capacity` seats
+    # from `concurrency` threads released at the same moment, then checks
+    # that exactly `capacity` got in, both in the seat counter and in
+    # event_registrations. The scratch event is deleted afterwards.
+    # The pool may grow to one connection per thread, so the run measures
+    # contention on the event row rather than waits for a connection.
+    database.pool.max_overflow = max(database.pool.max_overflow, concurrency)
+    event_id = _create_event(database, capacity)
+    token = secrets.token_hex(4)
+    pending = iter(range(registrations))
+    lock = threading.Lock()
+    gate = threading.Event()
+    latencies = []
+    outcomes = {}
+
+    def client():
+        gate.wait()
+        while True:
+            with lock:
+                number = next(pending, None)
+            if number is None:
+                return
+            started = time.perf_counter()
+            success, message = database.register_for_event(event_id, {
+                'name': f'Capacity check {number}',
+                'email': f'capacity-check-{token}-{number}@example.com',
+            })
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                key = 'registered' if success else message
+                outcomes[key] = outcomes.get(key, 0) + 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    gate.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    try:
+        participants, rows = _counts(database, event_id)
+    finally:
+        database.delete_event(event_id)
+
+    expected = min(capacity, registrations)
+    problems = []
+    if participants != expected:
+        problems.append(f"current_participants is {participants}, expected {expected}")
+    if rows != expected:
+        problems.append(f"{rows} registration rows, expected {expected}")
+    if outcomes.get('registered', 0) != expected:
+        problems.append(f"{outcomes.get('registered', 0)} signups reported success, expected {expected}")
+
+    latencies.sort()
+    return {
+        'registrations': registrations,
+        'capacity': capacity,
+        'concurrency': concurrency,
+        'participants': participants,
+        'rows': rows,
+        'outcomes': outcomes,
+        'per_sec': registrations / elapsed if elapsed else None,
+        'p50': latencies[len(latencies) // 2] if latencies else None,
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else None,
+        'problems': problems,
+    }
+
+
+def _create_event(database, capacity):
+    connection = database.get_connection(scoped=False)
+    if connection is None:
+        raise RuntimeError('Database connection failed')
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO events (title, date, time, location, description, category, max_participants, is_active)
+            VALUES ('Capacity check', CURDATE(), '12:00:00', 'Nowhere', 'Scratch event for registration_check.py',
+                    'Meeting', %s, TRUE)
+        """, (capacity,))
+        connection.commit()
+        return cursor.lastrowid
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def _counts(database, event_id):
+    connection = database.get_connection(scoped=False)
+    if connection is None:
+        raise RuntimeError('Database connection failed')
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT current_participants FROM events WHERE id = %s", (event_id,))
+        participants = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM event_registrations WHERE event_id = %s", (event_id,))
+        rows = cursor.fetchone()[0]
+        return participants, rows
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def main(argv=None):
+    from database import db
+
+    parser = argparse.ArgumentParser(description='Check that concurrent registrations never overfill an event')
+    parser.add_argument('--registrations', type=int, default=500)
+    parser.add_argument('--capacity', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=100,
+                        help='parallel clients; keep below the server max_connections')
+    args = parser.parse_args(argv)
+
+    result = run_check(db, args.registrations, args.capacity, args.concurrency)
+    print(f"{result['registrations']} signups for {result['capacity']} seats from {result['concurrency']} threads")
+    for outcome, count in sorted(result['outcomes'].items()):
+        print(f"    {outcome}: {count}")
+    print(f"{result['per_sec']:.1f} signups/sec, p50 {result['p50'] * 1000:.1f} ms, p99 {result['p99'] * 1000:.1f} ms")
+    for problem in result['problems']:
+        print(f"❌ {problem}")
+    if result['problems']:
+        return 1
+    print(f"✅ Exactly {result['participants']} registered")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from functools import partial
+from mysql.connector import Error
+from pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Replica routing decided by a request and carried to threads that run its
+# reads without a request context (see ConcurrentDatabase)
+routed_reads = ContextVar('routed_reads', default=None)
+
+
+def parse_hosts(hosts, default_port=3306):
+    # "db-replica-1, db-replica-2:3307" -> [('db-replica-1', 3306), ('db-replica-2', 3307)]
+    parsed = []
+    for entry in hosts:
+        host, _, port = entry.strip().partition(':')
+        parsed.append((host, int(port) if port else default_port))
+    return parsed
+
+
+class Replica:
+    def __init__(self, host, port, pool):
+        self.host = host
+        self.port = port
+        self.pool = pool
+        self.healthy = True
+        self.lag = None
+        self.error = None
+        self.checked_at = None
+
+
+class ReplicaSet:
+    # Read-only MySQL replicas, each behind its own ConnectionPool. A
+    # background thread checks every replica each `interval` seconds: it must
+    # answer and, when it reports replication status, be running no more than
+    # max_lag seconds behind. Reads go to the healthy replica with the fewest
+    # connections in use (ties broken at random); acquire() returns None when
+    # no replica can serve, and the caller falls back to the primary.
+    def __init__(self, hosts, connect, pool_options, interval=5, max_lag=None):
+        self.replicas = [
+            Replica(host, port, ConnectionPool(partial(connect, host, port), **pool_options))
+            for host, port in hosts
+        ]
+        self.interval = interval
+        self.max_lag = max_lag
+        self._lock = threading.Lock()
+        self._pid = None
+        self._stats = {'reads': 0, 'fallbacks': 0, 'errors': 0}
+
+    def _start(self):
+        # One checker per process; a forked worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name='replica-health', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+    def acquire(self):
+        self._start()
+        candidates = [replica for replica in self.replicas if replica.healthy]
+        random.shuffle(candidates)
+        candidates.sort(key=lambda replica: replica.pool.stats()['in_use'])
+        for replica in candidates:
+            try:
+                connection = replica.pool.acquire()
+            except Exception as e:
+                self._stats['errors'] += 1
+                self._mark(replica, False, error=str(e))
+                continue
+            self._stats['reads'] += 1
+            return connection
+        self._stats['fallbacks'] += 1
+        return None
+
+    def check(self):
+        for replica in self.replicas:
+            try:
+                connection = replica.pool.acquire()
+            except Exception as e:
+                self._mark(replica, False, error=str(e))
+                continue
+            try:
+                lag, running = self._replication_lag(connection)
+            except Error as e:
+                self._mark(replica, False, error=str(e))
+                continue
+            finally:
+                connection.close()
+            if not running:
+                self._mark(replica, False, lag=lag, error='Replication is not running')
+            elif self.max_lag is not None and lag is not None and lag > self.max_lag:
+                self._mark(replica, False, lag=lag, error=f'{lag}s behind the primary')
+            else:
+                self._mark(replica, True, lag=lag)
+
+    def _replication_lag(self, connection):
+        # Returns (seconds behind, running). A server that reports no
+        # replication status (or that we may not ask) is taken as running.
+        cursor = connection.cursor(dictionary=True)
+        try:
+            row = None
+            for statement in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):
+                try:
+                    cursor.execute(statement)
+                    rows = cursor.fetchall()
+                    row = rows[0] if rows else None
+                    break
+                except Error:
+                    continue
+            if row is None:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                return None, True
+            lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+            return lag, lag is not None
+        finally:
+            cursor.close()
+
+    def _mark(self, replica, healthy, lag=None, error=None):
+        if replica.healthy != healthy:
+            if healthy:
+                logger.info(f"Replica {replica.host}:{replica.port} is healthy again")
+            else:
+                logger.warning(f"Replica {replica.host}:{replica.port} taken out of rotation: {error}")
+        replica.healthy = healthy
+        replica.lag = lag
+        replica.error = error
+        replica.checked_at = time.time()
+
+    def status(self):
+        return [{
+            'host': replica.host,
+            'port': replica.port,
+            'healthy': replica.healthy,
+            'lag_seconds': replica.lag,
+            'error': replica.error,
+            'checked_at': replica.checked_at,
+            'pool': replica.pool.stats(),
+        } for replica in self.replicas]
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['replicas'] = len(self.replicas)
+        stats['healthy'] = sum(replica.healthy for replica in self.replicas)
+        for index, replica in enumerate(self.replicas):
+            stats[f'{index}_healthy'] = int(replica.healthy)
+            stats[f'{index}_in_use'] = replica.pool.stats()['in_use']
+            if replica.lag is not None:
+                stats[f'{index}_lag_seconds'] = replica.lag
+        return stats
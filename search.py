@@ -0,0 +1,203 @@
+import bisect
+import math
+import re
+import threading
+from collections import Counter
+from cache import content_namespace
+
+TOKEN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+TITLE_WEIGHT = 2
+PREFIX_WEIGHT = 0.7
+MAX_EXPANSIONS = 50
+
+
+def tokenize(text):
+    return TOKEN.findall((text or '').lower())
+
+
+def _event_doc(event):
+    return {
+        'kind': 'event',
+        'id': event['id'],
+        'title': event['title'],
+        'category': event['category'],
+        'summary': event['description'],
+        'date': event['date'],
+        'location': event['location'],
+        'body': ' '.join([event['description'] or '', event['location'] or '']),
+    }
+
+
+def _project_doc(project):
+    technologies = project.get('technologies') or []
+    return {
+        'kind': 'project',
+        'id': project['id'],
+        'title': project['title'],
+        'category': project['category'],
+        'summary': project['description'],
+        'github_url': project.get('github_url'),
+        'technologies': technologies,
+        'body': ' '.join([project['description'] or '', *technologies]),
+    }
+
+
+class SearchIndex:
+    # Inverted index over events and projects ranked with BM25. Title terms
+    # count double. Query terms also match as prefixes of indexed terms
+    # ("flas" finds Flask) at a reduced weight.
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs = {}
+        self._postings = {}
+        self._total_length = 0
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc):
+        key = (doc['kind'], doc['id'])
+        self.remove(*key)
+        terms = Counter(tokenize(doc['title']) * TITLE_WEIGHT + tokenize(doc['body']))
+        self._docs[key] = (doc, sum(terms.values()))
+        self._total_length += sum(terms.values())
+        for term, count in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._vocabulary_dirty = True
+            postings[key] = count
+
+    def remove(self, kind, doc_id):
+        entry = self._docs.pop((kind, doc_id), None)
+        if entry is None:
+            return
+        doc, length = entry
+        self._total_length -= length
+        for term in set(tokenize(doc['title']) + tokenize(doc['body'])):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop((kind, doc_id), None)
+                if not postings:
+                    del self._postings[term]
+                    self._vocabulary_dirty = True
+
+    def clear(self, kind):
+        for key in [key for key in self._docs if key[0] == kind]:
+            self.remove(*key)
+
+    def _expand(self, term):
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        expansions = {term: 1.0} if term in self._postings else {}
+        if len(term) >= 2:
+            start = bisect.bisect_left(self._vocabulary, term)
+            for candidate in self._vocabulary[start:start + MAX_EXPANSIONS]:
+                if not candidate.startswith(term):
+                    break
+                expansions.setdefault(candidate, PREFIX_WEIGHT)
+        return expansions
+
+    def search(self, query, kind=None, category=None, limit=20):
+        if not self._docs:
+            return []
+        count = len(self._docs)
+        average = self._total_length / count
+        scores = {}
+        for term in set(tokenize(query)):
+            for candidate, weight in self._expand(term).items():
+                postings = self._postings[candidate]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    doc, length = self._docs[key]
+                    if kind and key[0] != kind:
+                        continue
+                    if category and doc['category'] != category:
+                        continue
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / average)
+                    scores[key] = scores.get(key, 0) + weight * idf * tf * (self.k1 + 1) / norm
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [dict(self._docs[key][0], score=round(score, 3)) for key, score in ranked]
+
+    def categories(self, kind=None):
+        return sorted({doc['category'] for (doc_kind, _), (doc, _) in self._docs.items() if not kind or doc_kind == kind})
+
+
+class SearchService:
+    # Keeps a per-worker SearchIndex in step with MySQL. Write paths in this
+    # worker report the rows they touched (see Database.listeners), which
+    # are re-read on the next search; if the shared content version moved
+    # further than our own writes explain, another worker changed indexed
+    # rows and that kind is rebuilt from scratch. Writes that only move
+    # counters (registrations) leave the content version alone.
+    def __init__(self, database, versions):
+        self.database = database
+        self.versions = versions
+        self.index = SearchIndex()
+        self._lock = threading.Lock()
+        self._kinds = {
+            'events': ('event', self._load_events, database.get_event_by_id, _event_doc),
+            'projects': ('project', self._load_projects, database.get_project_by_id, _project_doc),
+        }
+        self._seen = {namespace: None for namespace in self._kinds}
+        self._own = {namespace: 0 for namespace in self._kinds}
+        self._pending = {namespace: set() for namespace in self._kinds}
+        self._stale = {namespace: False for namespace in self._kinds}
+        database.listeners.append(self.changed)
+
+    def _load_events(self):
+        return self.database.get_all_events(active_only=False)
+
+    def _load_projects(self):
+        return self.database.get_all_projects()
+
+    def changed(self, namespace, ids):
+        # Runs right after the version bump. ids=None means "unknown rows".
+        if namespace not in self._kinds or ids == ():
+            return
+        with self._lock:
+            self._own[namespace] += 1
+            if ids is None:
+                self._stale[namespace] = True
+            else:
+                self._pending[namespace].update(ids)
+
+    def refresh(self):
+        with self._lock:
+            for namespace, (kind, load_all, load_one, to_doc) in self._kinds.items():
+                version = self.versions.get(content_namespace(namespace))
+                seen = self._seen[namespace]
+                if seen is not None and version == seen and not self._pending[namespace]:
+                    continue
+                if seen is not None and not self.database.cache_fills_allowed():
+                    # A replica may not have the new rows yet; catch up later
+                    continue
+                if seen is None or self._stale[namespace] or version != seen + self._own[namespace]:
+                    self.index.clear(kind)
+                    for row in load_all():
+                        self.index.add(to_doc(row))
+                else:
+                    for row_id in self._pending[namespace]:
+                        row = load_one(row_id)
+                        if row is None:
+                            self.index.remove(kind, row_id)
+                        else:
+                            self.index.add(to_doc(row))
+                self._seen[namespace] = version
+                self._own[namespace] = 0
+                self._pending[namespace] = set()
+                self._stale[namespace] = not self.database.cache_fills_allowed()
+
+    def search(self, query, kind=None, category=None, limit=20):
+        self.refresh()
+        with self._lock:
+            return self.index.search(query, kind=kind, category=category, limit=limit)
+
+    def categories(self, kind=None):
+        self.refresh()
+        with self._lock:
+            return self.index.categories(kind)
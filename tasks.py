@@ -0,0 +1,133 @@
+import logging
+from email.message import EmailMessage
+from config import Config
+from database import db
+from jobs import JobQueue, handler, PermanentFailure
+from certificates import CertificateJobs
+from newsletter import SMTPPool, sender_from_config
+
+logger = logging.getLogger(__name__)
+
+# Job kinds and their priorities; higher runs first
+EMAIL = 'email.send'
+REGISTRATION_CONFIRMATION = 'registrations.confirm'
+CERTIFICATES = 'certificates.issue'
+NEWSLETTER = 'newsletter.send'
+
+PRIORITIES = {
+    EMAIL: 10,
+    REGISTRATION_CONFIRMATION: 10,
+    CERTIFICATES: 0,
+    NEWSLETTER: -10,
+}
+
+queue = JobQueue(
+    db,
+    visibility_timeout=Config.JOB_VISIBILITY_TIMEOUT,
+    backoff_base=Config.JOB_BACKOFF_BASE
+)
+
+_smtp = None
+
+
+def smtp():
+    global _smtp
+    if _smtp is None:
+        _smtp = SMTPPool(
+            Config.SMTP_HOST,
+            Config.SMTP_PORT,
+            size=Config.WORKER_THREADS,
+            username=Config.SMTP_USERNAME,
+            password=Config.SMTP_PASSWORD,
+            use_tls=Config.SMTP_USE_TLS
+        )
+    return _smtp
+
+
+def enqueue(kind, payload, delay=0):
+    return queue.enqueue(kind, payload, priority=PRIORITIES[kind], delay=delay,
+                         max_attempts=Config.JOB_MAX_ATTEMPTS)
+
+
+def enqueue_many(kind, payloads):
+    return queue.enqueue_many(kind, payloads, priority=PRIORITIES[kind], max_attempts=Config.JOB_MAX_ATTEMPTS)
+
+
+def close():
+    if _smtp is not None:
+        _smtp.close()
+
+
+@handler(EMAIL)
+def send_email(payload):
+    message = EmailMessage()
+    message['From'] = Config.NEWSLETTER_FROM
+    message['To'] = payload['to']
+    message['Subject'] = payload['subject']
+    message.set_content(payload['body'])
+    smtp().send(message)
+
+
+@handler(REGISTRATION_CONFIRMATION)
+def confirm_registration(payload):
+    event = db.get_event_by_id(payload['event_id'])
+    if event is None:
+        raise PermanentFailure(f"No event {payload['event_id']}")
+    send_email(registration_email(event, payload))
+
+
+@handler(CERTIFICATES)
+def issue_certificates(payload):
+    certificates = CertificateJobs(
+        db,
+        Config.CERTIFICATE_OUTPUT_DIR,
+        processes=Config.CERTIFICATE_RENDER_PROCESSES,
+        batch_size=Config.CERTIFICATE_BATCH_SIZE
+    )
+    job = certificates.status(payload['job_id'])
+    if job is None:
+        raise PermanentFailure(f"No certificate job {payload['job_id']}")
+    # Issuing is idempotent per (event, email), so a retry starts over
+    job.update(issued=0, rendered=0, error=None)
+    job = certificates.run(job, payload.get('issue_date'), payload.get('generated_by'))
+    if job['status'] == 'failed':
+        raise RuntimeError(job['error'])
+    return {'total': job['total'], 'output_dir': job['output_dir']}
+
+
+@handler(NEWSLETTER)
+def send_newsletter(payload):
+    sender = sender_from_config(db)
+    try:
+        campaign = sender.run(payload['campaign_id'])
+    except ValueError as e:
+        raise PermanentFailure(str(e))
+    finally:
+        sender.smtp.close()
+    return {'sent': campaign['sent'], 'failed': campaign['failed']}
+
+
+def welcome_email(member):
+    return {
+        'to': member['email'],
+        'subject': 'Welcome to the GMU Coding Club',
+        'body': (
+            f"Hi {member['name']},\n\n"
+            "Thanks for applying to the GMU Coding Club! We have received your "
+            "membership application and will be in touch about upcoming events.\n\n"
+            "GMU Coding Club"
+        ),
+    }
+
+
+def registration_email(event, registration):
+    return {
+        'to': registration['email'],
+        'subject': f"You're registered: {event['title']}",
+        'body': (
+            f"Hi {registration['name']},\n\n"
+            f"You are registered for {event['title']} on {event['date']} at {event['time']}, "
+            f"{event['location']}.\n\n"
+            "See you there!\nGMU Coding Club"
+        ),
+    }
@@ -0,0 +1,118 @@
+import argparse
+import logging
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    # Runs jobs from the queue on a pool of threads. A heartbeat thread
+    # extends the lease of every job in flight, so long jobs (newsletters,
+    # certificate batches) are not handed to another worker halfway through.
+    def __init__(self, queue, threads=4, queues=('default',), poll_interval=1, retention_days=7):
+        self.queue = queue
+        self.threads = threads
+        self.queues = queues
+        self.poll_interval = poll_interval
+        self.retention_days = retention_days
+        self.stopping = threading.Event()
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def _loop(self):
+        while not self.stopping.is_set():
+            claimed = self.queue.claim(self.queues, limit=1)
+            if not claimed:
+                self.stopping.wait(self.poll_interval)
+                continue
+            job = claimed[0]
+            with self._lock:
+                self._active[job['id']] = job
+            started = time.perf_counter()
+            try:
+                self.queue.run(job)
+            finally:
+                with self._lock:
+                    self._active.pop(job['id'], None)
+            logger.info(f"Job {job['id']} ({job['kind']}) finished in {time.perf_counter() - started:.2f}s")
+
+    def _heartbeat(self):
+        last_purge = None
+        while not self.stopping.wait(self.queue.visibility_timeout / 3):
+            with self._lock:
+                active = list(self._active.values())
+            for job in active:
+                if not self.queue.extend(job):
+                    logger.warning(f"Lost the lease on job {job['id']} ({job['kind']})")
+            if last_purge is None or time.monotonic() - last_purge > 3600:
+                self.queue.purge(self.retention_days)
+                last_purge = time.monotonic()
+
+    def run(self):
+        threads = [threading.Thread(target=self._loop, name=f'worker-{i}') for i in range(self.threads)]
+        threads.append(threading.Thread(target=self._heartbeat, name='worker-heartbeat', daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads[:-1]:
+            thread.join()
+
+    def stop(self, *args):
+        # Running jobs finish; nothing new is claimed
+        self.stopping.set()
+
+
+def run_process(threads, queues, poll_interval):
+    import tasks
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(processName)s %(levelname)s %(message)s')
+    worker = Worker(tasks.queue, threads=threads, queues=queues, poll_interval=poll_interval,
+                    retention_days=Config.JOB_RETENTION_DAYS)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    try:
+        worker.run()
+    finally:
+        tasks.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run background jobs')
+    parser.add_argument('--processes', type=int, default=Config.WORKER_PROCESSES)
+    parser.add_argument('--threads', type=int, default=Config.WORKER_THREADS, help='threads per process')
+    parser.add_argument('--queue', action='append', dest='queues', help='queue to serve (repeatable)')
+    parser.add_argument('--poll-interval', type=float, default=Config.WORKER_POLL_INTERVAL)
+    args = parser.parse_args(argv)
+    queues = tuple(args.queues or ['default'])
+
+    if args.processes <= 1:
+        run_process(args.threads, queues, args.poll_interval)
+        return 0
+
+    # spawn so each process opens its own pools and SMTP sessions
+    context = multiprocessing.get_context('spawn')
+    processes = [
+        context.Process(target=run_process, args=(args.threads, queues, args.poll_interval), name=f'worker-{i}')
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def stop(*_):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for process in processes:
+        process.join()
+    return max(process.exitcode or 0 for process in processes)
+
+
+if __name__ == '__main__':
+    sys.exit(main())